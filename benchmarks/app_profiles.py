@@ -0,0 +1,171 @@
+'''
+Benchmark of the per-app traversal profiles over synthetic app-shaped trees.
+
+Builds fake UI Automation trees shaped like File Explorer (a large items view), Word (a ribbon
+above the document) and a line-of-business app (a virtualized data grid), then runs the real
+traversal over each with an empty profile table and with the configured profiles. Reports the
+nodes visited, the UI Automation property reads (each one a cross-process call on Windows) and
+the traversal time.
+
+Usage:
+    python benchmarks/app_profiles.py --items 5000 --rows 10000 --repeat 3
+'''
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+from pathlib import Path
+from time import perf_counter
+import argparse
+import sys
+
+sys.path.insert(0,str(Path(__file__).resolve().parent.parent))
+if sys.platform!='win32':
+    # The tree package imports the Windows-only modules at import time, as in main_linux.py
+    for module in ['uiautomation','pyautogui']:
+        sys.modules.setdefault(module,MagicMock())
+    # The traversal checks isinstance against ImageControl, which has to be a class
+    sys.modules['uiautomation'].ImageControl=type('ImageControl',(),{})
+
+from src.desktop import Desktop  # noqa: E402,F401 (imported first to resolve the desktop/tree import cycle)
+from src.tree.profiles import compile_profiles  # noqa: E402
+from src.tree import Tree  # noqa: E402
+
+class Counter:
+    def __init__(self):
+        self.reads=0
+        self.nodes=set()
+
+class FakeRect:
+    def __init__(self,left:int,top:int,right:int,bottom:int):
+        self.left,self.top,self.right,self.bottom=left,top,right,bottom
+
+    def width(self)->int:
+        return self.right-self.left
+
+    def height(self)->int:
+        return self.bottom-self.top
+
+    def isempty(self)->bool:
+        return self.width()<=0 or self.height()<=0
+
+    def xcenter(self)->int:
+        return (self.left+self.right)//2
+
+    def ycenter(self)->int:
+        return (self.top+self.bottom)//2
+
+class FakeNode:
+    '''A control whose property reads and child navigation are counted, like calls into UI Automation.'''
+    def __init__(self,counter:Counter,control_type:str,name:str='',class_name:str='',box:tuple[int,int,int,int]=(0,0,100,20),children:list['FakeNode']|None=None,scrollable:bool=False):
+        self.counter=counter
+        self.children=children or []
+        self.next_sibling=None
+        for child,sibling in zip(self.children,self.children[1:]):
+            child.next_sibling=sibling
+        self.scrollable=scrollable
+        self.properties={
+            'ControlTypeName':control_type,
+            'LocalizedControlType':control_type.removesuffix('Control').lower(),
+            'Name':name,
+            'ClassName':class_name,
+            'AutomationId':'',
+            'AcceleratorKey':'',
+            'BoundingRectangle':FakeRect(*box),
+            'IsControlElement':True,
+            'IsOffscreen':False,
+            'IsEnabled':True,
+            'IsKeyboardFocusable':control_type in ('ButtonControl','EditControl','ListItemControl','TreeItemControl','DataItemControl'),
+            'ProcessId':0
+        }
+
+    def __getattr__(self,name:str):
+        properties=self.__dict__['properties']
+        if name not in properties:
+            raise AttributeError(name)
+        self.counter.reads+=1
+        self.counter.nodes.add(id(self))
+        return properties[name]
+
+    def GetChildren(self)->list['FakeNode']:
+        self.counter.reads+=1
+        return list(self.children)
+
+    def GetFirstChildControl(self)->'FakeNode|None':
+        self.counter.reads+=1
+        return self.children[0] if self.children else None
+
+    def GetNextSiblingControl(self)->'FakeNode|None':
+        self.counter.reads+=1
+        return self.next_sibling
+
+    def GetScrollPattern(self):
+        self.counter.reads+=1
+        return SimpleNamespace(VerticallyScrollable=self.scrollable,HorizontallyScrollable=False)
+
+def build_explorer(counter:Counter,items:int)->FakeNode:
+    toolbar=FakeNode(counter,'ToolBarControl','Command Bar',children=[FakeNode(counter,'ButtonControl',f'Command {index}') for index in range(20)])
+    navigation=FakeNode(counter,'TreeControl','Navigation Pane',scrollable=True,children=[FakeNode(counter,'TreeItemControl',f'Folder {index}') for index in range(items//10)])
+    rows=[FakeNode(counter,'ListItemControl',f'File {index}.txt',box=(200,100+index*20,1200,120+index*20),children=[
+        FakeNode(counter,'EditControl','Name'),
+        FakeNode(counter,'TextControl','Date modified'),
+        FakeNode(counter,'TextControl','Type'),
+        FakeNode(counter,'TextControl','Size')
+    ]) for index in range(items)]
+    items_view=FakeNode(counter,'ListControl','Items View',box=(200,100,1200,1000),scrollable=True,children=rows)
+    return FakeNode(counter,'WindowControl','Downloads - File Explorer','CabinetWClass',box=(0,0,1920,1080),children=[toolbar,navigation,items_view])
+
+def build_word(counter:Counter,tabs:int)->FakeNode:
+    groups=[FakeNode(counter,'GroupControl',f'Group {tab}.{group}',children=[FakeNode(counter,'ButtonControl',f'Command {tab}.{group}.{index}') for index in range(12)]) for tab in range(tabs) for group in range(8)]
+    ribbon_tabs=[FakeNode(counter,'TabItemControl',f'Tab {index}') for index in range(tabs)]
+    ribbon=FakeNode(counter,'ToolBarControl','Ribbon','MsoCommandBar',children=[FakeNode(counter,'TabControl','Ribbon Tabs',children=ribbon_tabs),FakeNode(counter,'PaneControl','Lower Ribbon',children=groups)])
+    document=FakeNode(counter,'DocumentControl','Page 1',box=(100,200,1800,1000),children=[FakeNode(counter,'TextControl',f'Paragraph {index}') for index in range(200)])
+    return FakeNode(counter,'WindowControl','Document1 - Word','OpusApp',box=(0,0,1920,1080),children=[ribbon,document])
+
+def build_grid(counter:Counter,rows:int)->FakeNode:
+    grid=FakeNode(counter,'DataGridControl','Orders',box=(0,100,1920,1000),scrollable=True,children=[
+        FakeNode(counter,'DataItemControl',f'Row {index}',children=[FakeNode(counter,'EditControl',f'Cell {index}.{column}') for column in range(6)]) for index in range(rows)
+    ])
+    return FakeNode(counter,'WindowControl','Orders','WindowsForms10.Window',box=(0,0,1920,1080),children=[FakeNode(counter,'ButtonControl','Refresh'),grid])
+
+# Process ids of the synthetic apps, resolved to process names by the fake process cache
+PROCESS_NAMES={1:'explorer.exe',2:'WINWORD.EXE',3:'orders.exe'}
+
+def build_app(build,counter:Counter,size:int,pid:int)->FakeNode:
+    root=build(counter,size)
+    root.properties['ProcessId']=pid
+    return root
+
+def run(tree:Tree,build,size:int,pid:int,repeat:int)->dict:
+    best=None
+    for _ in range(repeat):
+        counter=Counter()
+        root=build_app(build,counter,size,pid)
+        counter.reads,counter.nodes=0,set()
+        start=perf_counter()
+        interactive_nodes,informative_nodes,scrollable_nodes=tree.get_nodes(root)
+        elapsed=perf_counter()-start
+        if best is None or elapsed<best['time']:
+            best={'time':elapsed,'nodes':len(counter.nodes),'reads':counter.reads,'elements':len(interactive_nodes)+len(informative_nodes)+len(scrollable_nodes)}
+    return best
+
+def main():
+    parser=argparse.ArgumentParser(description='Benchmark the traversal with and without the per-app profiles.')
+    parser.add_argument('--items',type=int,default=5000,help='Items in the File Explorer view')
+    parser.add_argument('--tabs',type=int,default=10,help='Tabs in the Word ribbon')
+    parser.add_argument('--rows',type=int,default=10000,help='Rows in the data grid')
+    parser.add_argument('--repeat',type=int,default=3)
+    args=parser.parse_args()
+    desktop=SimpleNamespace(is_app_browser=lambda node:False,processes=SimpleNamespace(get_name=lambda pid:PROCESS_NAMES.get(pid,'')))
+    baseline,profiled=Tree(desktop),Tree(desktop)
+    # An empty table walks every child and classifies with the global control type sets, as before the profiles
+    baseline.profiles=compile_profiles([])
+    for pid,(app,build,size) in enumerate([('File Explorer',build_explorer,args.items),('Word',build_word,args.tabs),('Data grid',build_grid,args.rows)],start=1):
+        before=run(baseline,build,size,pid,args.repeat)
+        after=run(profiled,build,size,pid,args.repeat)
+        print(f"{app} ({profiled.get_profile(build_app(build,Counter(),1,pid)).name} profile):")
+        print(f"  nodes visited: {before['nodes']} -> {after['nodes']}")
+        print(f"  property reads: {before['reads']} -> {after['reads']} ({before['reads']/max(after['reads'],1):.1f}x fewer)")
+        print(f"  elements: {before['elements']} -> {after['elements']}")
+        print(f"  traversal: {before['time']*1000:.1f}ms -> {after['time']*1000:.1f}ms ({before['time']/max(after['time'],1e-9):.1f}x faster)")
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,210 @@
+'''
+Load generator for the Windows-MCP server running on the mock backend (main_linux.py).
+
+Spawns N MCP clients over stdio (one server process per client) or SSE (one shared server
+process), replays a weighted mix of tool calls and writes throughput, per-tool latency
+percentiles and server CPU/RSS samples to a JSON file for comparison across commits.
+
+Usage:
+    python benchmarks/load_test.py --transport stdio --clients 4 --duration 30
+    python benchmarks/load_test.py --transport sse --clients 16 --calls 500 --output sse.json
+
+A soak run, checking that server RSS stays flat over many State-Tool calls:
+    python benchmarks/load_test.py --clients 1 --calls 10000 --mix State-Tool=1 --sample-interval 5
+'''
+from fastmcp.client.transports import PythonStdioTransport, SSETransport
+from datetime import datetime, timezone
+from contextlib import AsyncExitStack
+from pathlib import Path
+from fastmcp import Client
+from time import perf_counter
+import subprocess
+import argparse
+import asyncio
+import socket
+import random
+import psutil
+import json
+import sys
+import os
+
+ROOT=Path(__file__).resolve().parent.parent
+SERVER_SCRIPT=ROOT/'main_linux.py'
+
+TOOL_ARGUMENTS={
+    'State-Tool':{'use_vision':False},
+    'Click-Tool':{'loc':[640,360]},
+    'Type-Tool':{'loc':[640,360],'text':'hello world'},
+    'Scrape-Tool':{'url':'https://example.com'},
+}
+
+DEFAULT_MIX='State-Tool=4,Click-Tool=3,Type-Tool=2,Scrape-Tool=1'
+
+def parse_mix(mix:str)->dict[str,float]:
+    weights={}
+    for item in mix.split(','):
+        name,_,weight=item.partition('=')
+        name=name.strip()
+        if name not in TOOL_ARGUMENTS:
+            raise ValueError(f'Unknown tool {name!r} in mix, expected one of {", ".join(TOOL_ARGUMENTS)}')
+        weights[name]=float(weight or 1)
+    return weights
+
+def percentile(values:list[float],percent:float)->float:
+    # Nearest-rank percentile
+    if not values:
+        return 0.0
+    ordered=sorted(values)
+    index=max(0,min(len(ordered)-1,round(percent/100*len(ordered)+0.5)-1))
+    return ordered[index]
+
+def get_commit()->str|None:
+    try:
+        result=subprocess.run(['git','rev-parse','HEAD'],cwd=ROOT,capture_output=True,check=True,text=True)
+        return result.stdout.strip()
+    except (OSError,subprocess.CalledProcessError):
+        return None
+
+def get_free_port()->int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1',0))
+        return sock.getsockname()[1]
+
+async def wait_for_port(port:int,timeout:float=30.0):
+    deadline=perf_counter()+timeout
+    while perf_counter()<deadline:
+        try:
+            _,writer=await asyncio.open_connection('127.0.0.1',port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f'Server did not start listening on port {port} within {timeout}s')
+
+async def run_client(client:Client,client_id:int,weights:dict[str,float],calls:int|None,deadline:float|None,latencies:dict[str,list[float]],errors:dict[str,int],seed:int):
+    rng=random.Random(seed+client_id)
+    names,values=list(weights.keys()),list(weights.values())
+    count=0
+    while (calls is None or count<calls) and (deadline is None or perf_counter()<deadline):
+        name=rng.choices(names,weights=values)[0]
+        start=perf_counter()
+        try:
+            result=await client.call_tool_mcp(name,TOOL_ARGUMENTS[name])
+            failed=result.isError
+        except Exception:
+            failed=True
+        latencies[name].append(perf_counter()-start)
+        if failed:
+            errors[name]+=1
+        count+=1
+
+async def sample_resources(get_processes,interval:float,samples:list[dict],started:float):
+    known:dict[int,psutil.Process]={}
+    while True:
+        cpu_percent,rss=0.0,0
+        for proc in get_processes():
+            # Keep the same Process objects so cpu_percent measures the interval since the last sample
+            proc=known.setdefault(proc.pid,proc)
+            try:
+                cpu_percent+=proc.cpu_percent(interval=None)
+                rss+=proc.memory_info().rss
+            except psutil.Error:
+                continue
+        samples.append({'time':round(perf_counter()-started,3),'cpu_percent':cpu_percent,'rss':rss})
+        await asyncio.sleep(interval)
+
+async def run(args)->dict:
+    weights=parse_mix(args.mix)
+    latencies={name:[] for name in weights}
+    errors={name:0 for name in weights}
+    env={**os.environ,'WINDOWS_MCP_MOCK_ELEMENTS':str(args.elements),'WINDOWS_MCP_MOCK_SEED':str(args.seed),'PYTHONPATH':str(ROOT)}
+    server=None
+    if args.transport=='stdio':
+        clients=[Client(PythonStdioTransport(script_path=str(SERVER_SCRIPT),env=env,cwd=str(ROOT),keep_alive=False)) for _ in range(args.clients)]
+        harness=psutil.Process()
+        def get_processes()->list[psutil.Process]:
+            # One server per stdio client, each spawned as a child of the harness
+            return harness.children(recursive=True)
+    else:
+        port=get_free_port()
+        server=subprocess.Popen([sys.executable,str(SERVER_SCRIPT),'--transport','sse','--port',str(port)],cwd=ROOT,env=env,stdout=subprocess.DEVNULL,stderr=subprocess.DEVNULL)
+        await wait_for_port(port)
+        clients=[Client(SSETransport(f'http://127.0.0.1:{port}/sse')) for _ in range(args.clients)]
+        server_process=psutil.Process(server.pid)
+        def get_processes()->list[psutil.Process]:
+            return [server_process]
+    samples=[]
+    try:
+        async with AsyncExitStack() as stack:
+            # Connect every client before the clock starts so server startup is not measured
+            await asyncio.gather(*[stack.enter_async_context(client) for client in clients])
+            started=perf_counter()
+            deadline=started+args.duration if args.calls is None else None
+            sampler=asyncio.create_task(sample_resources(get_processes,args.sample_interval,samples,started))
+            try:
+                await asyncio.gather(*[run_client(client,client_id,weights,args.calls,deadline,latencies,errors,args.seed) for client_id,client in enumerate(clients)])
+            finally:
+                elapsed=perf_counter()-started
+                sampler.cancel()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    total_calls=sum(len(values) for values in latencies.values())
+    return {
+        'commit':get_commit(),
+        'timestamp':datetime.now(timezone.utc).isoformat(),
+        'config':{
+            'transport':args.transport,
+            'clients':args.clients,
+            'duration':args.duration if args.calls is None else None,
+            'calls_per_client':args.calls,
+            'mix':weights,
+            'elements':args.elements,
+            'seed':args.seed
+        },
+        'elapsed':elapsed,
+        'total_calls':total_calls,
+        'throughput':total_calls/elapsed if elapsed else 0.0,
+        'tools':{name:{
+            'calls':len(values),
+            'errors':errors[name],
+            'throughput':len(values)/elapsed if elapsed else 0.0,
+            'mean':sum(values)/len(values) if values else 0.0,
+            'p50':percentile(values,50),
+            'p95':percentile(values,95),
+            'p99':percentile(values,99),
+            'max':max(values,default=0.0)
+        } for name,values in latencies.items()},
+        'rss':{
+            'start':samples[0]['rss'] if samples else None,
+            'end':samples[-1]['rss'] if samples else None,
+            'peak':max((sample['rss'] for sample in samples),default=None)
+        },
+        'resources':samples
+    }
+
+def main():
+    parser=argparse.ArgumentParser(description='Load test the Windows-MCP server on the mock backend.')
+    parser.add_argument('--transport',choices=['stdio','sse'],default='stdio')
+    parser.add_argument('--clients',type=int,default=4,help='Number of concurrent MCP clients')
+    parser.add_argument('--duration',type=float,default=30.0,help='Seconds to run when --calls is not given')
+    parser.add_argument('--calls',type=int,default=None,help='Tool calls per client, overrides --duration')
+    parser.add_argument('--mix',default=DEFAULT_MIX,help='Comma separated Tool=weight pairs')
+    parser.add_argument('--elements',type=int,default=200,help='Elements in each synthetic desktop state')
+    parser.add_argument('--sample-interval',type=float,default=0.5,help='Seconds between server CPU/RSS samples')
+    parser.add_argument('--seed',type=int,default=0)
+    parser.add_argument('--output',default='load_test.json',help='Path of the JSON results file')
+    args=parser.parse_args()
+    results=asyncio.run(run(args))
+    Path(args.output).write_text(json.dumps(results,indent=2))
+    print(f"{results['total_calls']} calls in {results['elapsed']:.2f}s ({results['throughput']:.1f} calls/s)")
+    for name,stats in results['tools'].items():
+        print(f"{name}: {stats['calls']} calls, {stats['errors']} errors, p50 {stats['p50']*1000:.1f}ms p95 {stats['p95']*1000:.1f}ms p99 {stats['p99']*1000:.1f}ms")
+    if results['resources']:
+        rss=results['rss']
+        print(f"Server RSS: {rss['start']/2**20:.1f}MB at start, {rss['end']/2**20:.1f}MB at end, {rss['peak']/2**20:.1f}MB peak")
+    print(f'Results written to {args.output}')
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,81 @@
+'''
+Benchmark of the spatial index over synthetic element bounding boxes.
+
+Builds the index over N boxes laid out like desktop UI (many small controls, a few large panes)
+and compares point and rectangle queries against a linear scan.
+
+Usage:
+    python benchmarks/spatial_index.py --boxes 100000 --queries 10000
+'''
+from unittest.mock import MagicMock
+from pathlib import Path
+from time import perf_counter
+import argparse
+import random
+import sys
+
+sys.path.insert(0,str(Path(__file__).resolve().parent.parent))
+if sys.platform!='win32':
+    # The tree package imports the Windows-only modules at import time, as in main_linux.py
+    for module in ['uiautomation','pyautogui']:
+        sys.modules.setdefault(module,MagicMock())
+
+from src.desktop import Desktop  # noqa: E402,F401 (imported first to resolve the desktop/tree import cycle)
+from src.tree.views import BoundingBox  # noqa: E402
+from src.tree.spatial import SpatialIndex  # noqa: E402
+
+SCREEN_WIDTH,SCREEN_HEIGHT=3840,2160
+
+def random_box(rng:random.Random)->BoundingBox:
+    # Mostly control-sized boxes with the occasional pane or window
+    if rng.random()<0.01:
+        width,height=rng.randint(400,SCREEN_WIDTH),rng.randint(300,SCREEN_HEIGHT)
+    else:
+        width,height=rng.randint(8,200),rng.randint(8,60)
+    left,top=rng.randint(0,SCREEN_WIDTH-width),rng.randint(0,SCREEN_HEIGHT-height)
+    return BoundingBox(left=left,top=top,right=left+width,bottom=top+height,width=width,height=height)
+
+def timed(function,*args)->tuple[float,object]:
+    start=perf_counter()
+    result=function(*args)
+    return perf_counter()-start,result
+
+def main():
+    parser=argparse.ArgumentParser(description='Benchmark the spatial index against a linear scan.')
+    parser.add_argument('--boxes',type=int,default=100_000)
+    parser.add_argument('--queries',type=int,default=10_000)
+    parser.add_argument('--seed',type=int,default=0)
+    args=parser.parse_args()
+    rng=random.Random(args.seed)
+    boxes=[random_box(rng) for _ in range(args.boxes)]
+    points=[(rng.randrange(SCREEN_WIDTH),rng.randrange(SCREEN_HEIGHT)) for _ in range(args.queries)]
+    rects=[random_box(rng) for _ in range(args.queries//10)]
+
+    def build():
+        index=SpatialIndex()
+        for label,box in enumerate(boxes):
+            index.insert(label,box)
+        return index
+
+    build_time,index=timed(build)
+    point_time,indexed_points=timed(lambda:[index.find(x,y) for x,y in points])
+    rect_time,indexed_rects=timed(lambda:[index.query_rect(rect) for rect in rects])
+
+    def linear_find(x,y):
+        matches=[label for label,box in enumerate(boxes) if box.contains(x,y)]
+        return min(matches,key=lambda label:boxes[label].width*boxes[label].height,default=None)
+
+    # The linear scan is slow, so it runs on a sample of the queries
+    sample=points[:max(1,len(points)//100)]
+    linear_point_time,linear_points=timed(lambda:[linear_find(x,y) for x,y in sample])
+    linear_rect_time,linear_rects=timed(lambda:[[label for label,box in enumerate(boxes) if box.intersects(rect)] for rect in rects[:max(1,len(rects)//10)]])
+    assert [boxes[label].width*boxes[label].height if label is not None else None for label in indexed_points[:len(sample)]]==[boxes[label].width*boxes[label].height if label is not None else None for label in linear_points]
+    assert indexed_rects[:len(linear_rects)]==linear_rects
+
+    print(f'Boxes: {args.boxes}, cells: {[len(cells) for _,cells in index.grids]}, oversized: {len(index.oversized)}')
+    print(f'Build: {build_time*1000:.1f}ms')
+    print(f'Point query: {point_time/len(points)*1e6:.1f}us indexed vs {linear_point_time/len(sample)*1e6:.1f}us linear')
+    print(f'Rect query: {rect_time/len(rects)*1e6:.1f}us indexed vs {linear_rect_time/len(linear_rects)*1e6:.1f}us linear')
+
+if __name__=='__main__':
+    main()
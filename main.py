@@ -1,10 +1,11 @@
 from live_inspect.watch_cursor import WatchCursor
 from contextlib import asynccontextmanager
-from fastmcp.utilities.types import Image
 from humancursor import SystemCursor
 from platform import system, release
 from markdownify import markdownify
 from src.desktop import Desktop
+from src.profiler import profiled
+from src import tools
 from textwrap import dedent
 from fastmcp import FastMCP
 from typing import Literal
@@ -45,6 +46,7 @@ async def lifespan(app: FastMCP):
 mcp=FastMCP(name='windows-mcp',instructions=instructions,lifespan=lifespan)
 
 @mcp.tool(name='Launch-Tool', description='Launch an application from the Windows Start Menu by name (e.g., "notepad", "calculator", "chrome")')
+@profiled('Launch-Tool')
 def launch_tool(name: str) -> str:
     _,status=desktop.launch_app(name)
     if status!=0:
@@ -53,36 +55,18 @@ def launch_tool(name: str) -> str:
         return f'Launched {name.title()}.'
     
 @mcp.tool(name='Powershell-Tool', description='Execute PowerShell commands and return the output with status code')
+@profiled('Powershell-Tool')
 def powershell_tool(command: str) -> str:
     response,status=desktop.execute_command(command)
     return f'Status Code: {status}\nResponse: {response}'
 
-@mcp.tool(name='State-Tool',description='Capture comprehensive desktop state including focused/opened applications, interactive UI elements (buttons, text fields, menus), informative content (text, labels, status), and scrollable areas. Optionally includes visual screenshot when use_vision=True. Essential for understanding current desktop context and available UI interactions.')
-def state_tool(use_vision:bool=False)->str:
-    desktop_state=desktop.get_state(use_vision=use_vision)
-    interactive_elements=desktop_state.tree_state.interactive_elements_to_string()
-    informative_elements=desktop_state.tree_state.informative_elements_to_string()
-    scrollable_elements=desktop_state.tree_state.scrollable_elements_to_string()
-    apps=desktop_state.apps_to_string()
-    active_app=desktop_state.active_app_to_string()
-    return [dedent(f'''
-    Focused App:
-    {active_app}
-
-    Opened Apps:
-    {apps}
-
-    List of Interactive Elements:
-    {interactive_elements or 'No interactive elements found.'}
-
-    List of Informative Elements:
-    {informative_elements or 'No informative elements found.'}
-
-    List of Scrollable Elements:
-    {scrollable_elements or 'No scrollable elements found.'}
-    ''')]+([Image(data=desktop_state.screenshot,format='png')] if use_vision else [])
+@mcp.tool(name='State-Tool',description='Capture comprehensive desktop state including focused/opened applications, interactive UI elements (buttons, text fields, menus), informative content (text, labels, status), and scrollable areas. Optionally includes visual screenshot when use_vision=True. Informative elements are deduplicated and ranked by relevance; set budget (in budget_unit of chars or tokens) to cap their size, with summary lines for what was left out. To traverse less, scope the state to one app (app, fuzzy-matched name), one window (handle) or a screen region (region as left,top,right,bottom); only that part is traversed and screenshotted. Set profile=True to capture a profile of the call for debugging. Essential for understanding current desktop context and available UI interactions.')
+@profiled('State-Tool')
+def state_tool(use_vision:bool=False,budget:int=None,budget_unit:Literal['chars','tokens']='chars',app:str=None,handle:int=None,region:tuple[int,int,int,int]=None,profile:bool=False)->str:
+    return tools.state_tool(desktop,use_vision=use_vision,budget=budget,budget_unit=budget_unit,app=app,handle=handle,region=region)
     
 @mcp.tool(name='Clipboard-Tool',description='Copy text to clipboard or retrieve current clipboard content. Use "copy" mode with text parameter to copy, "paste" mode to retrieve.')
+@profiled('Clipboard-Tool')
 def clipboard_tool(mode: Literal['copy', 'paste'], text: str = None)->str:
     if mode == 'copy':
         if text:
@@ -96,29 +80,34 @@ def clipboard_tool(mode: Literal['copy', 'paste'], text: str = None)->str:
     else:
         raise ValueError('Invalid mode. Use "copy" or "paste".')
 
-@mcp.tool(name='Click-Tool',description='Click on UI elements at specific coordinates. Supports left/right/middle mouse buttons and single/double/triple clicks. Use coordinates from State-Tool output.')
-def click_tool(loc:tuple[int,int],button:Literal['left','right','middle']='left',clicks:int=1)->str:
+@mcp.tool(name='Click-Tool',description='Click on UI elements at specific coordinates or by label. Supports left/right/middle mouse buttons and single/double/triple clicks. Use coordinates or labels from State-Tool output.')
+@profiled('Click-Tool')
+def click_tool(loc:tuple[int,int]=None,label:int=None,button:Literal['left','right','middle']='left',clicks:int=1)->str:
+    loc=tools.resolve_loc(desktop,loc,label)
     x,y=loc
     cursor.move_to(loc)
-    control=desktop.get_element_under_cursor()
+    element=desktop.describe_element_at(loc)
     pg.mouseDown()
     pg.click(button=button,clicks=clicks)
     pg.mouseUp()
     num_clicks={1:'Single',2:'Double',3:'Triple'}
-    return f'{num_clicks.get(clicks)} {button} Clicked on {control.Name} Element with ControlType {control.ControlTypeName} at ({x},{y}).'
+    return f'{num_clicks.get(clicks)} {button} Clicked on {element} at ({x},{y}).'
 
-@mcp.tool(name='Type-Tool',description='Type text into input fields, text areas, or focused elements. Set clear=True to replace existing text, False to append. Click on target element coordinates first.')
-def type_tool(loc:tuple[int,int],text:str,clear:bool=False):
+@mcp.tool(name='Type-Tool',description='Type text into input fields, text areas, or focused elements. Set clear=True to replace existing text, False to append. Target the element by coordinates or by label from State-Tool output.')
+@profiled('Type-Tool')
+def type_tool(text:str,loc:tuple[int,int]=None,label:int=None,clear:bool=False):
+    loc=tools.resolve_loc(desktop,loc,label)
     x,y=loc
     cursor.click_on(loc)
-    control=desktop.get_element_under_cursor()
+    element=desktop.describe_element_at(loc)
     if clear=='True':
         pg.hotkey('ctrl','a')
         pg.press('backspace')
     pg.typewrite(text,interval=0.1)
-    return f'Typed {text} on {control.Name} Element with ControlType {control.ControlTypeName} at ({x},{y}).'
+    return f'Typed {text} on {element} at ({x},{y}).'
 
 @mcp.tool(name='Switch-Tool',description='Switch to a specific application window (e.g., "notepad", "calculator", "chrome", etc.) and bring to foreground.')
+@profiled('Switch-Tool')
 def switch_tool(name: str) -> str:
     _,status=desktop.switch_app(name)
     if status!=0:
@@ -127,6 +116,7 @@ def switch_tool(name: str) -> str:
         return f'Switched to {name.title()} window.'
 
 @mcp.tool(name='Scroll-Tool',description='Scroll at specific coordinates or current mouse position. Use wheel_times to control scroll amount (1 wheel = ~3-5 lines). Essential for navigating lists, web pages, and long content.')
+@profiled('Scroll-Tool')
 def scroll_tool(loc:tuple[int,int]=None,type:Literal['horizontal','vertical']='vertical',direction:Literal['up','down','left','right']='down',wheel_times:int=1)->str:
     if loc:
         cursor.move_to(loc)
@@ -159,36 +149,55 @@ def scroll_tool(loc:tuple[int,int]=None,type:Literal['horizontal','vertical']='v
             return 'Invalid type. Use "horizontal" or "vertical".'
     return f'Scrolled {type} {direction} by {wheel_times} wheel times.'
 
-@mcp.tool(name='Drag-Tool',description='Drag and drop operation from source coordinates to destination coordinates. Useful for moving files, resizing windows, or drag-and-drop interactions.')
-def drag_tool(from_loc:tuple[int,int],to_loc:tuple[int,int])->str:
-    control=desktop.get_element_under_cursor()
+@mcp.tool(name='Drag-Tool',description='Drag and drop operation from source to destination, given as coordinates or State-Tool labels. Useful for moving files, resizing windows, or drag-and-drop interactions.')
+@profiled('Drag-Tool')
+def drag_tool(from_loc:tuple[int,int]=None,to_loc:tuple[int,int]=None,from_label:int=None,to_label:int=None)->str:
+    from_loc=tools.resolve_loc(desktop,from_loc,from_label)
+    to_loc=tools.resolve_loc(desktop,to_loc,to_label)
+    element=desktop.describe_element_at(from_loc)
     x1,y1=from_loc
     x2,y2=to_loc
     cursor.drag_and_drop(from_loc,to_loc)
-    return f'Dragged the {control.Name} element with ControlType {control.ControlTypeName} from ({x1},{y1}) to ({x2},{y2}).'
+    return f'Dragged the {element} from ({x1},{y1}) to ({x2},{y2}).'
 
 @mcp.tool(name='Move-Tool',description='Move mouse cursor to specific coordinates without clicking. Useful for hovering over elements or positioning cursor before other actions.')
+@profiled('Move-Tool')
 def move_tool(to_loc:tuple[int,int])->str:
     x,y=to_loc
     cursor.move_to(to_loc)
     return f'Moved the mouse pointer to ({x},{y}).'
 
 @mcp.tool(name='Shortcut-Tool',description='Execute keyboard shortcuts using key combinations. Pass keys as list (e.g., ["ctrl", "c"] for copy, ["alt", "tab"] for app switching, ["win", "r"] for Run dialog).')
+@profiled('Shortcut-Tool')
 def shortcut_tool(shortcut:list[str]):
     pg.hotkey(*shortcut)
     return f'Pressed {'+'.join(shortcut)}.'
 
 @mcp.tool(name='Key-Tool',description='Press individual keyboard keys. Supports special keys like "enter", "escape", "tab", "space", "backspace", "delete", arrow keys ("up", "down", "left", "right"), function keys ("f1"-"f12").')
+@profiled('Key-Tool')
 def key_tool(key:str='')->str:
     pg.press(key)
     return f'Pressed the key {key}.'
 
 @mcp.tool(name='Wait-Tool',description='Pause execution for specified duration in seconds. Useful for waiting for applications to load, animations to complete, or adding delays between actions.')
+@profiled('Wait-Tool')
 def wait_tool(duration:int)->str:
     pg.sleep(duration)
     return f'Waited for {duration} seconds.'
 
+@mcp.tool(name='Wait-For-Tool',description='Wait until a condition holds instead of sleeping for a fixed time. Conditions: "appears"/"disappears" for an element matching name (substring) and/or control_type (e.g. "Button") in app or the foreground window, "title" for a window whose title contains title, "focus" for a change of the focused element, "stable" for the screen region (left,top,right,bottom) or whole screen to stop changing. Returns the elapsed time and the matching element, or reports a timeout.')
+@profiled('Wait-For-Tool')
+def wait_for_tool(condition:Literal['appears','disappears','title','focus','stable'],name:str=None,control_type:str=None,app:str=None,title:str=None,region:tuple[int,int,int,int]=None,timeout:float=10.0)->str:
+    result=desktop.wait_for(condition=condition,name=name,control_type=control_type,app_name=app,title=title,region=region,timeout=timeout)
+    return result.to_string()
+
+@mcp.tool(name='Memory-Tool',description='Report the memory use of the server: process RSS, the size of each cache against the configured limits and, when tracemalloc is enabled, the top allocation sites.')
+@profiled('Memory-Tool')
+def memory_tool()->str:
+    return desktop.governor.get_usage().to_string()
+
 @mcp.tool(name='Scrape-Tool',description='Fetch and convert webpage content to markdown format. Provide full URL including protocol (http/https). Returns structured text content suitable for analysis.')
+@profiled('Scrape-Tool')
 def scrape_tool(url:str)->str:
     response=requests.get(url,timeout=10)
     html=response.text
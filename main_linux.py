@@ -1,83 +1,170 @@
-# Simplified main.py for Linux testing
-from fastmcp import FastMCP
-from textwrap import dedent
-
-# Mock the Windows-specific imports to avoid errors
-class MockDesktop:
-    def launch_app(self, name):
-        return f"Mock launch of {name} (not available in Linux)", 1
-
-class MockCursor:
-    pass
-
-class MockWatchCursor:
-    def start(self):
-        pass
-    def stop(self):
-        pass
-
-# Mock Windows-specific modules
-import sys
+# Mock backend of main.py for Linux testing and benchmarking
 from unittest.mock import MagicMock
+import sys
 
-# Mock the problematic imports
+# Mock the Windows-specific modules before anything imports them
 sys.modules['live_inspect.watch_cursor'] = MagicMock()
 sys.modules['humancursor'] = MagicMock()
 sys.modules['uiautomation'] = MagicMock()
 sys.modules['pyautogui'] = MagicMock()
 sys.modules['pyperclip'] = MagicMock()
-sys.modules['src.desktop'] = MagicMock()
 
-# Set up the MCP server
+from src.desktop import Desktop
+from src.tree.views import TreeState, TreeElementNode, TextElementNode, ScrollElementNode, BoundingBox, Center
+from src.tree.config import APP_MATCH_CUTOFF
+from src.desktop.views import App, Size
+from contextlib import asynccontextmanager
+from humancursor import SystemCursor
+from markdownify import markdownify
+from src.profiler import profiled
+from src import tools
+from textwrap import dedent
+from fuzzywuzzy import process
+from fastmcp import FastMCP
+from typing import Literal
+from PIL import Image as PILImage
+import pyautogui as pg
+import argparse
+import asyncio
+import random
+import os
+
+SCREEN_SIZE=(1920,1080)
+MOCK_ELEMENTS=int(os.environ.get('WINDOWS_MCP_MOCK_ELEMENTS','200'))
+# Seeds the synthetic layouts, so the same sequence of calls produces the same load on every run
+MOCK_SEED=int(os.environ.get('WINDOWS_MCP_MOCK_SEED','0'))
+MOCK_APPS=['Notepad','Google Chrome','File Explorer','Settings']
+MOCK_HTML='<html><body><h1>Example Domain</h1><p>This domain is for use in illustrative examples in documents.</p><a href="https://www.iana.org/domains/example">More information...</a></body></html>'
+
+class MockDesktop(Desktop):
+    '''Desktop that serves synthetic, app-shaped states instead of walking UI Automation.'''
+    def __init__(self,num_elements:int=MOCK_ELEMENTS,seed:int=MOCK_SEED):
+        super().__init__()
+        self.num_elements=num_elements
+        self.random=random.Random(seed)
+
+    def get_tree_state(self,app_name:str|None=None,handle:int|None=None,region:BoundingBox|None=None)->TreeState:
+        # Raises the same errors as the traversal for a handle or app that matches no window
+        if handle is not None:
+            if not 0<=handle<len(MOCK_APPS):
+                raise ValueError(f'Window handle {handle} not found. Call State-Tool without a handle to get the open windows.')
+            app_name=MOCK_APPS[handle]
+        elif app_name is not None:
+            matched_app=process.extractOne(app_name,MOCK_APPS,score_cutoff=APP_MATCH_CUTOFF)
+            if matched_app is None:
+                raise ValueError(f'App {app_name} not found. Call State-Tool without an app to get the open windows.')
+            app_name,_=matched_app
+        screen_width,screen_height=SCREEN_SIZE
+        interactive_nodes,informative_nodes,scrollable_nodes=[],[],[]
+        for index in range(self.num_elements):
+            node_app_name=MOCK_APPS[index%len(MOCK_APPS)] if index%5 else 'Taskbar'
+            left,top=self.random.randrange(0,screen_width-120),self.random.randrange(0,screen_height-40)
+            box=BoundingBox(left=left,top=top,right=left+120,bottom=top+40,width=120,height=40)
+            if (app_name is not None and node_app_name!=app_name) or (region is not None and not box.intersects(region)):
+                continue
+            center=Center(x=left+60,y=top+20)
+            match index%4:
+                case 0|1:
+                    interactive_nodes.append(TreeElementNode(name=f'Button {index}',control_type='Button',shortcut="''",bounding_box=box,center=center,app_name=node_app_name,app_window=SCREEN_SIZE))
+                case 2:
+                    informative_nodes.append(TextElementNode(name=f'Label {index%50}',app_name=node_app_name,bounding_box=box))
+                case 3:
+                    if index%40==3:
+                        scrollable_nodes.append(ScrollElementNode(name=f'Pane {index}',control_type='Pane',app_name=node_app_name,bounding_box=box,center=center,horizontal_scrollable=False,vertical_scrollable=True))
+                    else:
+                        informative_nodes.append(TextElementNode(name="''",app_name=node_app_name,bounding_box=box))
+        viewport=BoundingBox(left=0,top=0,right=screen_width,bottom=screen_height,width=screen_width,height=screen_height)
+        return TreeState(interactive_nodes=interactive_nodes,informative_nodes=informative_nodes,scrollable_nodes=scrollable_nodes,viewport=viewport,scope=region)
+
+    def get_apps(self)->list[App]:
+        process_info=self.processes.get(os.getpid())
+        return [App(name=name,depth=depth,status='Normal',size=Size(width=800,height=600),handle=depth,process=process_info) for depth,name in enumerate(MOCK_APPS)]
+
+    def get_screenshot(self,scale:float=0.7,region:BoundingBox|None=None)->PILImage.Image:
+        screen_width,screen_height=(region.width,region.height) if region is not None else SCREEN_SIZE
+        return PILImage.new('RGB',(int(screen_width*scale),int(screen_height*scale)),color=(32,32,32))
+
+    def launch_app(self,name:str):
+        return (f'Mock launch of {name} (not available in Linux)',1)
+
 instructions = dedent('''
-Linux-compatible Windows MCP server (limited functionality).
-This version runs on Linux but has limited Windows desktop interaction capabilities.
-Suitable for testing and development purposes.
+Linux-compatible Windows MCP server backed by a mock desktop.
+Tools return synthetic desktop states, which makes this version suitable for testing and benchmarking.
 ''')
 
 desktop = MockDesktop()
-cursor = MockCursor()
-watch_cursor = MockWatchCursor()
-
-from contextlib import asynccontextmanager
-import asyncio
+cursor = SystemCursor()
 
 @asynccontextmanager
 async def lifespan(app: FastMCP):
     """Runs initialization code before the server starts and cleanup code after it shuts down."""
-    try:
-        watch_cursor.start()
-        await asyncio.sleep(1)  # Simulate startup latency
-        yield
-    except Exception:
-        pass
-    finally:
-        watch_cursor.stop()
+    await asyncio.sleep(1)  # Simulate startup latency
+    yield
 
 mcp = FastMCP(name='windows-mcp-linux', instructions=instructions, lifespan=lifespan)
 
 @mcp.tool(name='Launch-Tool', description='Mock launch tool for testing (Linux version)')
+@profiled('Launch-Tool')
 def launch_tool(name: str) -> str:
     """Mock launch tool that simulates launching an application."""
     return f'Mock: Would launch {name.title()} (not available in Linux container)'
 
-@mcp.tool(name='State-Tool', description='Mock state tool for testing (Linux version)')
-def state_tool(use_vision: bool = False) -> str:
-    """Mock state tool that simulates getting desktop state."""
-    return 'Mock: Desktop state not available in Linux container'
+@mcp.tool(name='State-Tool', description='Mock state tool returning a synthetic desktop state, optionally scoped to an app, window handle or region (Linux version)')
+@profiled('State-Tool')
+def state_tool(use_vision:bool=False,budget:int=None,budget_unit:Literal['chars','tokens']='chars',app:str=None,handle:int=None,region:tuple[int,int,int,int]=None,profile:bool=False)->str:
+    return tools.state_tool(desktop,use_vision=use_vision,budget=budget,budget_unit=budget_unit,app=app,handle=handle,region=region)
+
+@mcp.tool(name='Click-Tool',description='Mock click tool for testing (Linux version)')
+@profiled('Click-Tool')
+def click_tool(loc:tuple[int,int]=None,label:int=None,button:Literal['left','right','middle']='left',clicks:int=1)->str:
+    loc=tools.resolve_loc(desktop,loc,label)
+    x,y=loc
+    cursor.move_to(loc)
+    element=desktop.describe_element_at(loc)
+    pg.click(button=button,clicks=clicks)
+    num_clicks={1:'Single',2:'Double',3:'Triple'}
+    return f'{num_clicks.get(clicks)} {button} Clicked on {element} at ({x},{y}).'
+
+@mcp.tool(name='Type-Tool',description='Mock type tool for testing (Linux version)')
+@profiled('Type-Tool')
+def type_tool(text:str,loc:tuple[int,int]=None,label:int=None,clear:bool=False):
+    loc=tools.resolve_loc(desktop,loc,label)
+    x,y=loc
+    cursor.click_on(loc)
+    element=desktop.describe_element_at(loc)
+    pg.typewrite(text,interval=0.1)
+    return f'Typed {text} on {element} at ({x},{y}).'
+
+@mcp.tool(name='Memory-Tool',description='Report the memory use of the server: process RSS, the size of each cache against the configured limits and, when tracemalloc is enabled, the top allocation sites.')
+@profiled('Memory-Tool')
+def memory_tool()->str:
+    return desktop.governor.get_usage().to_string()
+
+@mcp.tool(name='Scrape-Tool',description='Mock scrape tool converting a canned webpage to markdown (Linux version)')
+@profiled('Scrape-Tool')
+def scrape_tool(url:str)->str:
+    content=markdownify(html=MOCK_HTML)
+    return f'Scraped the contents of the entire webpage:\n{content}'
 
 @mcp.tool(name='Screenshot-Tool', description='Mock screenshot tool for testing (Linux version)')
+@profiled('Screenshot-Tool')
 def screenshot_tool() -> str:
     """Mock screenshot tool that simulates taking a screenshot."""
     return 'Mock: Screenshot not available in Linux container'
 
 @mcp.tool(name='Health-Check', description='Health check endpoint for container monitoring')
+@profiled('Health-Check')
 def health_check() -> str:
     """Health check endpoint for monitoring."""
     return 'Windows-MCP Linux version is running'
 
 if __name__ == '__main__':
-    print("Starting Windows-MCP Linux version...")
-    print("This is a limited functionality version for testing purposes.")
-    print("For full Windows desktop interaction, use the Windows version.")
-    mcp.run()
+    parser=argparse.ArgumentParser(description='Windows-MCP server with a mock desktop backend.')
+    parser.add_argument('--transport',choices=['stdio','sse'],default='stdio')
+    parser.add_argument('--host',default='127.0.0.1')
+    parser.add_argument('--port',type=int,default=8000)
+    args=parser.parse_args()
+    if args.transport=='sse':
+        mcp.run(transport='sse',host=args.host,port=args.port)
+    else:
+        mcp.run()
@@ -1,35 +1,69 @@
-from uiautomation import GetScreenSize, Control, GetRootControl, ControlType, GetFocusedControl, SetWindowTopmost
+from uiautomation import GetScreenSize, Control, GetRootControl, GetForegroundControl, ControlType, GetFocusedControl, SetWindowTopmost
 from src.desktop.config import EXCLUDED_APPS,BROWSER_NAMES
-from src.desktop.views import DesktopState,App,Size
+from src.desktop.views import DesktopState,App,Size,WaitResult
+from src.desktop.wait import Waiter
+from src.tree.views import BoundingBox,TreeElementNode,ScrollElementNode,TreeState
+from src.tree.spatial import SpatialIndex
+from src.desktop.processes import ProcessCache
+from src.memory import MemoryGovernor,SlotCache
 from fuzzywuzzy import process
-from psutil import Process
 from src.tree import Tree
-from time import sleep
+from time import sleep,monotonic
 from io import BytesIO
 from PIL import Image
+from typing import Literal
 import subprocess
+import hashlib
 import pyautogui
 import csv
 import io
 
 class Desktop:
     def __init__(self):
-        self.desktop_state=None
+        self.element_index=SpatialIndex()
+        self.states=SlotCache(on_evict=self.clear_element_index)
+        self.processes=ProcessCache()
+        self.governor=MemoryGovernor()
+        self.governor.register('desktop_state',self.states)
+        self.governor.register('processes',self.processes)
+
+    @property
+    def desktop_state(self)->DesktopState|None:
+        return self.states.get()
+
+    @desktop_state.setter
+    def desktop_state(self,desktop_state:DesktopState|None):
+        self.states.set(desktop_state)
+
+    def clear_element_index(self):
+        self.element_index=SpatialIndex()
         
-    def get_state(self,use_vision:bool=False)->DesktopState:
-        tree=Tree(self)
-        tree_state=tree.get_state()
+    def get_state(self,use_vision:bool=False,app_name:str|None=None,handle:int|None=None,region:tuple[int,int,int,int]|None=None)->DesktopState:
+        started=monotonic()
+        self.processes.refresh()
+        if region is not None:
+            left,top,right,bottom=region
+            if not (left<right and top<bottom):
+                raise ValueError(f'Invalid region {tuple(region)}. Pass it as (left,top,right,bottom) with left<right and top<bottom.')
+            region=BoundingBox(left=left,top=top,right=right,bottom=bottom,width=right-left,height=bottom-top)
+        tree_state=self.get_tree_state(app_name=app_name,handle=handle,region=region)
         if use_vision:
             nodes=tree_state.interactive_nodes
-            annotated_screenshot=tree.annotated_screenshot(nodes=nodes,scale=0.5) if use_vision else None
+            annotated_screenshot=Tree(self).annotated_screenshot(nodes=nodes,scale=0.5,region=tree_state.scope)
             screenshot=self.screenshot_in_bytes(screenshot=annotated_screenshot)
         else:
             screenshot=None
         apps=self.get_apps()
         active_app,apps=(apps[0],apps[1:]) if len(apps)>0 else (None,[])
-        self.desktop_state=DesktopState(apps=apps,active_app=active_app,screenshot=screenshot,tree_state=tree_state)
-        return self.desktop_state
+        desktop_state=DesktopState(apps=apps,active_app=active_app,screenshot=screenshot,tree_state=tree_state)
+        self.desktop_state=desktop_state
+        self.element_index=SpatialIndex.from_tree_state(tree_state)
+        self.governor.enforce(since=started)
+        return desktop_state
     
+    def get_tree_state(self,app_name:str|None=None,handle:int|None=None,region:BoundingBox|None=None)->TreeState:
+        return Tree(self).get_state(app_name=app_name,handle=handle,region=region)
+
     def get_taskbar(self)->Control:
         root=GetRootControl()
         taskbar=root.GetFirstChildControl()
@@ -47,12 +81,137 @@ class Desktop:
             return "Maximized"
         return "Normal"
     
-    def get_element_under_cursor(self)->Control:
-        return GetFocusedControl()
+    def get_element_at(self,loc:tuple[int,int])->TreeElementNode|ScrollElementNode|None:
+        # Resolved against the last snapshot, without a round trip to UI Automation
+        x,y=loc
+        match=self.element_index.find(x,y)
+        if match is None:
+            return None
+        _,node=match
+        return node
+
+    def get_element_by_label(self,label:int)->TreeElementNode|ScrollElementNode:
+        if not 0<=label<len(self.element_index):
+            raise ValueError(f'Label {label} not found in the last desktop state. Call State-Tool to refresh the labels.')
+        _,node=self.element_index.items[label]
+        return node
+
+    def describe_element_at(self,loc:tuple[int,int])->str:
+        node=self.get_element_at(loc)
+        if node is None:
+            return 'Unknown Element'
+        return f'{node.name} Element with ControlType {node.control_type}'
+
+    def describe_element(self,control:Control)->str:
+        box=control.BoundingRectangle
+        return f'{control.Name} Element with ControlType {control.ControlTypeName} at ({box.xcenter()},{box.ycenter()})'
+
+    def find_window(self,name:str)->Control|None:
+        windows={window.Name:window for window in GetRootControl().GetChildren() if window.Name}
+        matched_window=process.extractOne(name,list(windows.keys()))
+        if matched_window is None:
+            return None
+        window_name,_=matched_window
+        return windows.get(window_name)
+
+    def find_element(self,name:str|None=None,control_type:str|None=None,app_name:str|None=None)->Control|None:
+        # Search only the target window and stop at the first match instead of walking the desktop
+        window=self.find_window(app_name) if app_name else GetForegroundControl()
+        if window is None:
+            return None
+        conditions={}
+        if name:
+            conditions['SubName']=name
+        if control_type:
+            conditions['ControlType']=self.get_control_type(control_type)
+        control=Control(searchFromControl=window,**conditions)
+        return control if control.Exists(maxSearchSeconds=0) else None
+
+    def get_control_type(self,control_type:str)->int:
+        # Accepts 'ListItem', 'list item' (as State-Tool prints it) or 'ListItemControl'
+        key=control_type.replace(' ','').lower().removesuffix('control')+'control'
+        control_types={name.lower():name for name in dir(ControlType) if name.endswith('Control')}
+        if key not in control_types:
+            raise ValueError(f'Unknown control type {control_type}.')
+        return getattr(ControlType,control_types[key])
+
+    def get_window_titles(self)->list[str]:
+        return [window.Name for window in GetRootControl().GetChildren() if window.Name]
+
+    def get_focus_signature(self)->tuple|None:
+        try:
+            control=GetFocusedControl()
+            box=control.BoundingRectangle
+            return (control.Name,control.ControlTypeName,control.NativeWindowHandle,box.left,box.top,box.right,box.bottom)
+        except Exception:
+            return None
+
+    def get_region_digest(self,region:tuple[int,int,int,int]|None=None)->bytes:
+        if region is not None:
+            left,top,right,bottom=region
+            screenshot=pyautogui.screenshot(region=(left,top,right-left,bottom-top))
+        else:
+            screenshot=pyautogui.screenshot()
+        return hashlib.blake2b(screenshot.tobytes(),digest_size=16).digest()
+
+    def wait_for(self,condition:Literal['appears','disappears','title','focus','stable'],name:str|None=None,control_type:str|None=None,app_name:str|None=None,title:str|None=None,region:tuple[int,int,int,int]|None=None,timeout:float=10.0,waiter:Waiter|None=None)->WaitResult:
+        '''
+        Wait until a condition on the desktop holds, probing only what the condition needs.
+
+        Args:
+            condition: 'appears' or 'disappears' for an element matching name and control_type,
+                'title' for a window whose title contains title, 'focus' for a change of the focused
+                element and 'stable' for the screen region that stops changing.
+            name: Substring of the element name.
+            control_type: Control type of the element, such as Button or ButtonControl.
+            app_name: App to search the element in, defaults to the foreground window.
+            title: Substring of the window title.
+            region: Screen region (left, top, right, bottom) to watch, defaults to the whole screen.
+            timeout: Maximum seconds to wait.
+            waiter: Polling strategy, defaults to adaptive backoff with the configured intervals.
+
+        Returns:
+            WaitResult: Whether the condition held, the elapsed time and the matching element.
+        '''
+        waiter=waiter or Waiter()
+        if condition in ('appears','disappears') and not (name or control_type):
+            raise ValueError('No name or control_type provided to wait for.')
+        match condition:
+            case 'appears':
+                def probe():
+                    control=self.find_element(name=name,control_type=control_type,app_name=app_name)
+                    return self.describe_element(control) if control is not None else None
+            case 'disappears':
+                def probe():
+                    control=self.find_element(name=name,control_type=control_type,app_name=app_name)
+                    return f'{name or control_type} Element is gone' if control is None else None
+            case 'title':
+                if not title:
+                    raise ValueError('No title provided to wait for.')
+                def probe():
+                    matches=[window_title for window_title in self.get_window_titles() if title.lower() in window_title.lower()]
+                    return f'{matches[0]} Window' if matches else None
+            case 'focus':
+                initial=self.get_focus_signature()
+                def probe():
+                    if self.get_focus_signature()==initial:
+                        return None
+                    return self.describe_element(GetFocusedControl())
+            case 'stable':
+                previous=[None]
+                def probe():
+                    # Stable once two consecutive probes capture the same pixels
+                    digest=self.get_region_digest(region)
+                    if digest!=previous[0]:
+                        previous[0]=digest
+                        return None
+                    return 'Screen region is stable'
+            case _:
+                raise ValueError('Invalid condition. Use "appears", "disappears", "title", "focus" or "stable".')
+        return waiter.wait(probe,timeout)
     
     def is_app_browser(self,node:Control):
-        process=Process(node.ProcessId)
-        return process.name() in BROWSER_NAMES
+        return self.processes.get_name(node.ProcessId) in BROWSER_NAMES
     
     def get_apps_from_start_menu(self)->dict[str,str]:
         command='Get-StartApps | ConvertTo-Csv -NoTypeInformation'
@@ -84,7 +243,10 @@ class Desktop:
         return response,status
     
     def switch_app(self,name:str)->tuple[str,int]:
-        apps={app.name:app for app in self.desktop_state.apps}
+        desktop_state=self.desktop_state
+        if desktop_state is None:
+            return ('No desktop state available. Call State-Tool first.',1)
+        apps={app.name:app for app in desktop_state.apps}
         matched_app:tuple[str,float]=process.extractOne(name,list(apps.keys()))
         if matched_app is None:
             return (f'Application {name.title()} not found.',1)
@@ -125,7 +287,8 @@ class Desktop:
                 if element.ControlType in [ControlType.WindowControl, ControlType.PaneControl]:
                     status = self.get_app_status(element)
                     size=self.get_app_size(element)
-                    apps.append(App(name=element.Name, depth=depth, status=status,size=size,handle=element.NativeWindowHandle))
+                    process_info=self.processes.get(element.ProcessId)
+                    apps.append(App(name=element.Name, depth=depth, status=status,size=size,handle=element.NativeWindowHandle,process=process_info))
         except Exception as ex:
             print(f"Error: {ex}")
             apps = []
@@ -137,8 +300,11 @@ class Desktop:
         bytes=io.getvalue()
         return bytes
 
-    def get_screenshot(self,scale:float=0.7)->Image.Image:
-        screenshot=pyautogui.screenshot()
+    def get_screenshot(self,scale:float=0.7,region:BoundingBox|None=None)->Image.Image:
+        if region is not None:
+            screenshot=pyautogui.screenshot(region=(region.left,region.top,region.width,region.height))
+        else:
+            screenshot=pyautogui.screenshot()
         size=(screenshot.width*scale, screenshot.height*scale)
         screenshot.thumbnail(size=size, resample=Image.Resampling.LANCZOS)
         return screenshot
\ No newline at end of file
@@ -8,4 +8,14 @@ AVOIDED_APPS:Set[str]=set([
 
 EXCLUDED_APPS:Set[str]=set([
     'Program Manager','Taskbar'
-]).union(AVOIDED_APPS)
\ No newline at end of file
+]).union(AVOIDED_APPS)
+
+PROCESS_CACHE_TTL:float=5.0
+
+PROCESS_CACHE_USAGE:bool=False
+
+WAIT_INITIAL_INTERVAL:float=0.1
+
+WAIT_MAX_INTERVAL:float=1.0
+
+WAIT_BACKOFF:float=1.5
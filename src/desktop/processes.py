@@ -0,0 +1,109 @@
+from src.desktop.config import PROCESS_CACHE_TTL,PROCESS_CACHE_USAGE
+from src.desktop.views import ProcessInfo
+from src.memory.utils import get_deep_size
+from threading import Lock
+from time import monotonic
+import psutil
+
+class ProcessCache:
+    '''
+    Snapshot of the running processes keyed by `(pid, create_time)`, refreshed in bulk.
+
+    Lookups are served from the snapshot without any per-process call, and at most one bulk
+    scan runs per refresh cycle. The scan is the only validation: a process that exits or whose
+    PID is reused within the TTL is replaced on the next scan, as the new process gets a new key.
+    '''
+    def __init__(self,ttl:float=PROCESS_CACHE_TTL,with_usage:bool=PROCESS_CACHE_USAGE):
+        self.ttl=ttl
+        self.with_usage=with_usage
+        self.processes:dict[tuple[int,float],ProcessInfo]={}
+        self.pids:dict[int,tuple[int,float]]={}
+        self.accessed:dict[tuple[int,float],float]={}
+        self.last_scan:float|None=None
+        self.size=0
+        self.can_rescan=True
+        self.lock=Lock()
+
+    def is_stale(self)->bool:
+        return self.last_scan is None or monotonic()-self.last_scan>self.ttl
+
+    def refresh(self,force:bool=False):
+        '''Start a new refresh cycle, scanning right away if the snapshot is older than the TTL.'''
+        with self.lock:
+            self.can_rescan=True
+            if force or self.is_stale():
+                self.scan()
+
+    def scan(self):
+        attrs=['pid','name','exe','create_time']
+        if self.with_usage:
+            attrs.extend(['cpu_percent','memory_info'])
+        processes={}
+        for proc in psutil.process_iter(attrs=attrs,ad_value=None):
+            info=proc.info
+            if info.get('create_time') is None:
+                continue
+            memory_info=info.get('memory_info')
+            process_info=ProcessInfo(
+                pid=info['pid'],
+                create_time=info['create_time'],
+                name=info.get('name') or '',
+                exe=info.get('exe') or '',
+                cpu_percent=info.get('cpu_percent'),
+                memory=memory_info.rss if memory_info is not None else None
+            )
+            processes[process_info.key]=process_info
+        self.last_scan=monotonic()
+        self.processes=processes
+        # Measured once per snapshot, so the governor only adds up the stored sizes
+        self.size=get_deep_size(processes)
+        self.pids={pid:(pid,create_time) for pid,create_time in processes}
+        # Fresh entries count as used at scan time, known ones keep their last access
+        self.accessed={key:self.accessed.get(key,self.last_scan) for key in processes}
+        self.can_rescan=False
+
+    def lookup(self,pid:int)->ProcessInfo|None:
+        key=self.pids.get(pid)
+        if key is None:
+            return None
+        return self.processes[key]
+
+    def remove(self,key:tuple[int,float]):
+        info=self.processes.pop(key,None)
+        if info is not None:
+            self.size=max(self.size-get_deep_size(info),0)
+        self.accessed.pop(key,None)
+        if self.pids.get(key[0])==key:
+            del self.pids[key[0]]
+
+    def get(self,pid:int)->ProcessInfo|None:
+        '''Return the cached process for the PID, rescanning once per cycle on a miss.'''
+        with self.lock:
+            info=self.lookup(pid)
+            if info is None and self.can_rescan:
+                self.scan()
+                info=self.lookup(pid)
+            if info is not None:
+                self.accessed[info.key]=monotonic()
+            return info
+
+    def get_name(self,pid:int)->str:
+        info=self.get(pid)
+        return info.name if info is not None else ''
+
+    def __len__(self)->int:
+        return len(self.processes)
+
+    def memory_size(self)->int:
+        return self.size
+
+    def last_used(self)->float|None:
+        with self.lock:
+            return min(self.accessed.values(),default=None)
+
+    def evict_oldest(self)->bool:
+        with self.lock:
+            if not self.accessed:
+                return False
+            self.remove(min(self.accessed,key=self.accessed.get))
+            return True
@@ -9,9 +9,32 @@ class App:
     status:Literal['Maximized','Minimized','Normal']
     size:'Size'
     handle:int
+    process:Optional['ProcessInfo']=None
 
     def to_string(self):
-        return f'Name: {self.name} Depth: {self.depth} Status: {self.status} Size: {self.size.to_string()}'
+        process=f' Process: {self.process.to_string()}' if self.process is not None else ''
+        return f'Name: {self.name} Depth: {self.depth} Status: {self.status} Size: {self.size.to_string()}{process}'
+
+@dataclass
+class ProcessInfo:
+    pid:int
+    create_time:float
+    name:str
+    exe:str
+    cpu_percent:Optional[float]=None
+    memory:Optional[int]=None
+
+    @property
+    def key(self)->tuple[int,float]:
+        return (self.pid,self.create_time)
+
+    def to_string(self):
+        usage=''
+        if self.cpu_percent is not None:
+            usage+=f' CPU: {self.cpu_percent:.1f}%'
+        if self.memory is not None:
+            usage+=f' Memory: {self.memory/(1024*1024):.1f}MB'
+        return f'{self.name} (PID: {self.pid}){usage}'
 
 @dataclass
 class Size:
@@ -36,4 +59,17 @@ class DesktopState:
     def apps_to_string(self):
         if len(self.apps)==0:
             return 'No apps opened'
-        return '\n'.join([app.to_string() for app in self.apps])
\ No newline at end of file
+        return '\n'.join([app.to_string() for app in self.apps])
+
+@dataclass
+class WaitResult:
+    satisfied:bool
+    elapsed:float
+    probes:int
+    element:Optional[str]=None
+
+    def to_string(self):
+        if not self.satisfied:
+            return f'Timed out after {self.elapsed:.2f} seconds ({self.probes} probes).'
+        element=f' on {self.element}' if self.element else ''
+        return f'Condition met after {self.elapsed:.2f} seconds{element} ({self.probes} probes).'
@@ -0,0 +1,45 @@
+from src.desktop.config import WAIT_INITIAL_INTERVAL,WAIT_MAX_INTERVAL,WAIT_BACKOFF
+from src.desktop.views import WaitResult
+from time import monotonic, sleep
+from typing import Callable
+
+class Waiter:
+    '''
+    Polls a probe until it reports a match or the timeout expires.
+
+    The interval between probes starts small and grows geometrically up to a ceiling, so short
+    waits return quickly while long waits stay cheap. The clock and sleep functions can be
+    swapped for simulated ones.
+    '''
+    def __init__(self,initial_interval:float=WAIT_INITIAL_INTERVAL,max_interval:float=WAIT_MAX_INTERVAL,backoff:float=WAIT_BACKOFF,clock:Callable[[],float]=monotonic,sleep:Callable[[float],None]=sleep):
+        self.initial_interval=initial_interval
+        self.max_interval=max_interval
+        self.backoff=backoff
+        self.clock=clock
+        self.sleep=sleep
+
+    def wait(self,probe:Callable[[],str|None],timeout:float)->WaitResult:
+        '''
+        Block until the probe returns a description of the match.
+
+        Args:
+            probe: Returns a description of the matching element, or None while the condition does not hold.
+            timeout: Maximum seconds to wait.
+
+        Returns:
+            WaitResult: Whether the condition held, the elapsed time and the matching element.
+        '''
+        start=self.clock()
+        interval=self.initial_interval
+        probes=0
+        while True:
+            match=probe()
+            probes+=1
+            elapsed=self.clock()-start
+            if match is not None:
+                return WaitResult(satisfied=True,elapsed=elapsed,probes=probes,element=match)
+            remaining=timeout-elapsed
+            if remaining<=0:
+                return WaitResult(satisfied=False,elapsed=elapsed,probes=probes)
+            self.sleep(min(interval,remaining))
+            interval=min(interval*self.backoff,self.max_interval)
@@ -0,0 +1,136 @@
+from src.memory.config import MAX_RSS_MB,MAX_CACHE_MB,TRACEMALLOC_FRAMES,TRACEMALLOC_TOP
+from src.memory.views import MemoryUsage,CacheUsage,MB
+from src.memory.utils import get_deep_size
+from typing import Protocol,Generic,TypeVar,Callable
+from time import monotonic
+from threading import Lock
+import tracemalloc
+import psutil
+import gc
+
+class ManagedCache(Protocol):
+    def memory_size(self)->int:
+        '''Approximate bytes held by the cache, measured when entries are stored rather than on every call.'''
+        ...
+
+    def last_used(self)->float|None:
+        '''Monotonic time the least recently used entry was last used, or None when empty.'''
+        ...
+
+    def evict_oldest(self)->bool:
+        '''Drop the least recently used entry, returning False when there was nothing to drop.'''
+        ...
+
+    def __len__(self)->int:
+        ...
+
+T=TypeVar('T')
+
+class SlotCache(Generic[T]):
+    '''Holds a single value, such as the last desktop state, as a cache the governor can evict.'''
+    def __init__(self,on_evict:Callable[[],None]|None=None):
+        self.value:T|None=None
+        self.used:float|None=None
+        self.size=0
+        self.on_evict=on_evict
+
+    def get(self)->T|None:
+        if self.value is not None:
+            self.used=monotonic()
+        return self.value
+
+    def set(self,value:T|None):
+        self.value=value
+        self.used=monotonic() if value is not None else None
+        # Measured once per value, so the governor only adds up the stored sizes
+        self.size=get_deep_size(value) if value is not None else 0
+
+    def __len__(self)->int:
+        return 0 if self.value is None else 1
+
+    def memory_size(self)->int:
+        return self.size
+
+    def last_used(self)->float|None:
+        return self.used
+
+    def evict_oldest(self)->bool:
+        if self.value is None:
+            return False
+        self.set(None)
+        if self.on_evict is not None:
+            self.on_evict()
+        return True
+
+class MemoryGovernor:
+    '''
+    Keeps a long-running server within its memory limits.
+
+    Registered caches report the sizes they measured when their entries were stored, so checking
+    the limits after a tool call adds up a few integers. When their total exceeds the cache limit,
+    entries are evicted across all caches in least recently used order until it fits. When the
+    process RSS exceeds its limit, every entry older than the current call is evicted in that order. The entries the call just used, such as the desktop state it returns,
+    are kept, since the RSS seldom drops back under the limit and labels would stop resolving.
+    '''
+    def __init__(self,max_rss:int=int(MAX_RSS_MB*MB),max_cache_size:int=int(MAX_CACHE_MB*MB),tracemalloc_frames:int=TRACEMALLOC_FRAMES):
+        self.max_rss=max_rss
+        self.max_cache_size=max_cache_size
+        self.caches:dict[str,ManagedCache]={}
+        self.sizes:dict[str,int]={}
+        self.evictions=0
+        self.process=psutil.Process()
+        self.lock=Lock()
+        if tracemalloc_frames>0 and not tracemalloc.is_tracing():
+            tracemalloc.start(tracemalloc_frames)
+
+    def register(self,name:str,cache:ManagedCache):
+        self.caches[name]=cache
+        self.sizes[name]=0
+
+    def get_rss(self)->int:
+        return self.process.memory_info().rss
+
+    def evict_lru(self,before:float|None=None)->bool:
+        # The cache whose least recently used entry is the oldest overall loses that entry
+        candidates=[(last_used,name) for name,cache in self.caches.items() if (last_used:=cache.last_used()) is not None and (before is None or last_used<before)]
+        if not candidates:
+            return False
+        _,name=min(candidates)
+        cache=self.caches[name]
+        if not cache.evict_oldest():
+            return False
+        self.sizes[name]=cache.memory_size()
+        self.evictions+=1
+        return True
+
+    def enforce(self,since:float|None=None)->int:
+        '''
+        Collect the cache sizes and evict until the limits hold.
+
+        Args:
+            since: Monotonic start time of the current call. Entries used since then survive the RSS limit.
+
+        Returns:
+            The number of evictions.
+        '''
+        with self.lock:
+            evictions=self.evictions
+            self.sizes={name:cache.memory_size() for name,cache in self.caches.items()}
+            while sum(self.sizes.values())>self.max_cache_size and self.evict_lru():
+                pass
+            if self.get_rss()>self.max_rss:
+                while self.evict_lru(before=since):
+                    pass
+                # Give the freed objects back before the next measurement
+                gc.collect()
+            return self.evictions-evictions
+
+    def get_usage(self)->MemoryUsage:
+        with self.lock:
+            caches=[CacheUsage(name=name,size=cache.memory_size(),entries=len(cache)) for name,cache in self.caches.items()]
+        usage=MemoryUsage(rss=self.get_rss(),max_rss=self.max_rss,max_cache_size=self.max_cache_size,caches=caches,evictions=self.evictions)
+        if tracemalloc.is_tracing():
+            usage.traced_current,usage.traced_peak=tracemalloc.get_traced_memory()
+            statistics=tracemalloc.take_snapshot().statistics('lineno')[:TRACEMALLOC_TOP]
+            usage.top_allocations=[f'{statistic.traceback} Size: {statistic.size/1024:.1f}KB Count: {statistic.count}' for statistic in statistics]
+        return usage
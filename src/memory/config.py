@@ -0,0 +1,13 @@
+import os
+
+MAX_RSS_MB=float(os.environ.get('WINDOWS_MCP_MAX_RSS_MB','1024'))
+
+MAX_CACHE_MB=float(os.environ.get('WINDOWS_MCP_MAX_CACHE_MB','256'))
+
+# Frames kept per allocation by tracemalloc, 0 leaves it off
+TRACEMALLOC_FRAMES=int(os.environ.get('WINDOWS_MCP_TRACEMALLOC','0'))
+
+TRACEMALLOC_TOP=10
+
+# Lists longer than this are sized from an even sample of their items
+SIZE_SAMPLE=64
@@ -0,0 +1,36 @@
+from src.memory.config import SIZE_SAMPLE
+from dataclasses import is_dataclass, fields
+import sys
+
+def get_deep_size(obj:object,seen:set[int]|None=None,sample:int=SIZE_SAMPLE)->int:
+    '''
+    Approximate the bytes held by an object and everything it references.
+
+    Follows dataclass fields and containers, counting shared objects once. Other objects only
+    count their own size, so pass plain data such as views rather than live controls. Lists and
+    tuples longer than `sample` are extrapolated from an even sample of their items, so sizing
+    a state with thousands of elements walks about as many objects as one with a few dozen.
+    '''
+    seen=set() if seen is None else seen
+    stack=[obj]
+    size=0
+    while stack:
+        obj=stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size+=sys.getsizeof(obj)
+        if isinstance(obj,(str,bytes,bytearray,int,float,bool)) or obj is None:
+            continue
+        if isinstance(obj,dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj,(list,tuple)) and sample and len(obj)>sample:
+            step=len(obj)/sample
+            sampled_size=sum(get_deep_size(obj[int(index*step)],seen,sample) for index in range(sample))
+            size+=sampled_size*len(obj)//sample
+        elif isinstance(obj,(list,tuple,set,frozenset)):
+            stack.extend(obj)
+        elif is_dataclass(obj) and not isinstance(obj,type):
+            stack.extend(getattr(obj,field.name) for field in fields(obj))
+    return size
@@ -0,0 +1,36 @@
+from dataclasses import dataclass,field
+from typing import Optional
+
+MB=1024*1024
+
+@dataclass
+class CacheUsage:
+    name:str
+    size:int
+    entries:int
+
+    def to_string(self):
+        return f'Cache: {self.name} Size: {self.size/MB:.2f}MB Entries: {self.entries}'
+
+@dataclass
+class MemoryUsage:
+    rss:int
+    max_rss:int
+    max_cache_size:int
+    caches:list[CacheUsage]=field(default_factory=list)
+    evictions:int=0
+    traced_current:Optional[int]=None
+    traced_peak:Optional[int]=None
+    top_allocations:list[str]=field(default_factory=list)
+
+    def to_string(self):
+        cache_size=sum(cache.size for cache in self.caches)
+        lines=[
+            f'RSS: {self.rss/MB:.1f}MB (limit {self.max_rss/MB:.0f}MB)',
+            f'Caches: {cache_size/MB:.2f}MB (limit {self.max_cache_size/MB:.0f}MB) Evictions: {self.evictions}',
+            *[cache.to_string() for cache in self.caches]
+        ]
+        if self.traced_current is not None:
+            lines.append(f'Traced: {self.traced_current/MB:.1f}MB (peak {self.traced_peak/MB:.1f}MB)')
+            lines.extend(self.top_allocations)
+        return '\n'.join(lines)
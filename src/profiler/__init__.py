@@ -0,0 +1,171 @@
+from src.profiler.config import PROFILE_TOOLS,PROFILE_DIR,PROFILE_INTERVAL,PROFILE_TOP
+from src.profiler.views import ProfileResult,HotFunction
+from datetime import datetime
+from collections import Counter
+from functools import wraps
+from time import perf_counter
+from typing import Callable
+import concurrent.futures.thread
+import concurrent.futures._base
+import threading
+import cProfile
+import queue
+import inspect
+import pstats
+import json
+import sys
+import os
+
+profile_lock=threading.Lock()
+
+# Frames a thread sits in while it waits on other threads, such as a caller blocked on its pool
+IDLE_FILES=set([threading.__file__,queue.__file__,concurrent.futures._base.__file__,concurrent.futures.thread.__file__])
+
+class StackSampler(threading.Thread):
+    '''
+    Samples the Python stacks of the profiled threads at a fixed interval.
+
+    Only the thread that started the call and the threads created during it (such as the
+    traversal workers) are sampled, so idle server threads do not show up in the flamegraph.
+    Samples of a thread waiting on another one go to the flamegraph but not to `active`, the
+    stacks the hot functions are counted from.
+    '''
+    def __init__(self,interval:float=PROFILE_INTERVAL):
+        super().__init__(name='profiler-sampler',daemon=True)
+        self.interval=interval
+        self.target=threading.get_ident()
+        self.excluded=set(thread.ident for thread in threading.enumerate())-{self.target}
+        self.stacks:Counter[str]=Counter()
+        self.active:Counter[tuple[str,...]]=Counter()
+        self.samples=0
+        self.stopped=threading.Event()
+
+    def run(self):
+        self.excluded.add(threading.get_ident())
+        names,labels={},{}
+        while not self.stopped.wait(self.interval):
+            for ident,frame in sys._current_frames().items():
+                if ident in self.excluded:
+                    continue
+                if ident not in names:
+                    thread=next((thread for thread in threading.enumerate() if thread.ident==ident),None)
+                    names[ident]=thread.name if thread is not None else str(ident)
+                stack=[]
+                idle=frame.f_code.co_filename in IDLE_FILES
+                while frame is not None:
+                    code=frame.f_code
+                    if code not in labels:
+                        labels[code]=f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+                    stack.append(labels[code])
+                    frame=frame.f_back
+                if not idle:
+                    self.active[tuple(reversed(stack))]+=1
+                stack.append(names[ident])
+                self.stacks[';'.join(reversed(stack))]+=1
+            self.samples+=1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def to_collapsed(self)->str:
+        # Brendan Gregg's collapsed stack format, as read by flamegraph.pl and speedscope
+        return '\n'.join([f'{stack} {count}' for stack,count in self.stacks.most_common()])
+
+def get_hot_functions(sampler:StackSampler,stats:pstats.Stats,duration:float,limit:int=PROFILE_TOP)->list[HotFunction]:
+    '''
+    Rank the functions by the samples in which they were running, across every sampled thread.
+
+    cProfile only sees the calling thread, so it misses the traversal workers and counts the
+    caller's wait on them as lock time. The sampler covers all of them; cProfile only adds the
+    call counts of the calling thread, and stands in when the call was too short to be sampled.
+    '''
+    call_stats={f'{name} ({os.path.basename(filename)}:{line})':(calls,total_time,cumulative_time) for (filename,line,name),(_,calls,total_time,cumulative_time,_) in stats.stats.items()}
+    if not sampler.active:
+        hot_functions=[HotFunction(function=function,total_time=total_time,cumulative_time=cumulative_time,calls=count) for function,(count,total_time,cumulative_time) in call_stats.items()]
+        hot_functions.sort(key=lambda function:function.total_time,reverse=True)
+        return hot_functions[:limit]
+    # Each sample stands for the wall time between two ticks of the sampler
+    sample_time=duration/max(sampler.samples,1)
+    total_samples,cumulative_samples=Counter(),Counter()
+    for stack,count in sampler.active.items():
+        total_samples[stack[-1]]+=count
+        for function in set(stack):
+            cumulative_samples[function]+=count
+    return [HotFunction(
+        function=function,
+        total_time=count*sample_time,
+        cumulative_time=cumulative_samples[function]*sample_time,
+        calls=call_stats[function][0] if function in call_stats else None
+    ) for function,count in total_samples.most_common(limit)]
+
+def profile_call(tool:str,function:Callable,args:tuple,kwargs:dict,directory:str=PROFILE_DIR)->tuple[object,ProfileResult]:
+    '''
+    Run one call under cProfile and the stack sampler and write the results.
+
+    Writes `<stamp>-<tool>.pstats` from cProfile, `<stamp>-<tool>.collapsed` from the sampler and
+    `<stamp>-<tool>.json` with the arguments and the hot functions. Profiled calls run one at a
+    time since only one cProfile session can be active.
+
+    Returns:
+        The return value of the call and the profile result.
+    '''
+    with profile_lock:
+        return run_profiled_call(tool,function,args,kwargs,directory)
+
+def run_profiled_call(tool:str,function:Callable,args:tuple,kwargs:dict,directory:str)->tuple[object,ProfileResult]:
+    os.makedirs(directory,exist_ok=True)
+    stem=os.path.join(directory,f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{tool}")
+    profiler=cProfile.Profile()
+    sampler=StackSampler()
+    sampler.start()
+    start=perf_counter()
+    try:
+        result=profiler.runcall(function,*args,**kwargs)
+    finally:
+        duration=perf_counter()-start
+        sampler.stop()
+        profiler.dump_stats(f'{stem}.pstats')
+        with open(f'{stem}.collapsed','w') as file:
+            file.write(sampler.to_collapsed())
+        hot_functions=get_hot_functions(sampler,pstats.Stats(profiler),duration)
+        profile_result=ProfileResult(tool=tool,duration=duration,samples=sampler.samples,pstats_path=f'{stem}.pstats',collapsed_path=f'{stem}.collapsed',summary_path=f'{stem}.json',hot_functions=hot_functions)
+        with open(f'{stem}.json','w') as file:
+            json.dump({
+                'tool':tool,
+                'arguments':{**dict(enumerate(args)),**kwargs},
+                'duration':duration,
+                'samples':sampler.samples,
+                'pstats':profile_result.pstats_path,
+                'collapsed':profile_result.collapsed_path,
+                'hot_functions':[vars(function) for function in hot_functions]
+            },file,indent=2,default=repr)
+    return result,profile_result
+
+def profiled(tool:str)->Callable[[Callable],Callable]:
+    '''
+    Profile a tool when its call passes profile=True or WINDOWS_MCP_PROFILE names it.
+
+    Tools without a `profile` parameter that are not enabled through the environment are
+    returned unwrapped, so profiling costs nothing when it is off.
+    '''
+    def decorator(function:Callable)->Callable:
+        always=tool in PROFILE_TOOLS or 'all' in PROFILE_TOOLS
+        per_call='profile' in inspect.signature(function).parameters
+        if not (always or per_call):
+            return function
+        @wraps(function)
+        def wrapper(*args,**kwargs):
+            requested=kwargs.pop('profile',False)
+            if not (always or requested):
+                return function(*args,**kwargs)
+            result,profile_result=profile_call(tool,function,args,kwargs)
+            # Only a caller who asked for the profile gets it in the output
+            if requested:
+                if isinstance(result,list) and result and isinstance(result[0],str):
+                    return [f'{result[0]}\n{profile_result.to_string()}',*result[1:]]
+                if isinstance(result,str):
+                    return f'{result}\n{profile_result.to_string()}'
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,10 @@
+import os
+
+# Tools to profile on every call, comma separated, or 'all'
+PROFILE_TOOLS=set(name.strip() for name in os.environ.get('WINDOWS_MCP_PROFILE','').split(',') if name.strip())
+
+PROFILE_DIR=os.environ.get('WINDOWS_MCP_PROFILE_DIR',os.path.join('data','profiles'))
+
+PROFILE_INTERVAL=float(os.environ.get('WINDOWS_MCP_PROFILE_INTERVAL','0.001'))
+
+PROFILE_TOP=15
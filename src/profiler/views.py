@@ -0,0 +1,27 @@
+from dataclasses import dataclass,field
+from typing import Optional
+
+@dataclass
+class HotFunction:
+    function:str
+    total_time:float
+    cumulative_time:float
+    calls:Optional[int]=None
+
+    def to_string(self):
+        calls=f' Calls: {self.calls}' if self.calls is not None else ''
+        return f'{self.function}{calls} Total: {self.total_time*1000:.1f}ms Cumulative: {self.cumulative_time*1000:.1f}ms'
+
+@dataclass
+class ProfileResult:
+    tool:str
+    duration:float
+    samples:int
+    pstats_path:str
+    collapsed_path:str
+    summary_path:str
+    hot_functions:list[HotFunction]=field(default_factory=list)
+
+    def to_string(self):
+        hot_functions='\n'.join([function.to_string() for function in self.hot_functions[:5]])
+        return f'Profiled {self.tool} in {self.duration*1000:.1f}ms ({self.samples} samples), written to {self.summary_path}\n{hot_functions}'
@@ -0,0 +1,44 @@
+from src.tree.ranking import budgeted_informative_elements_to_string
+from fastmcp.utilities.types import Image
+from textwrap import dedent
+from typing import Literal,TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.desktop import Desktop
+
+def state_tool(desktop:'Desktop',use_vision:bool=False,budget:int|None=None,budget_unit:Literal['chars','tokens']='chars',app:str|None=None,handle:int|None=None,region:tuple[int,int,int,int]|None=None)->list:
+    '''Capture the desktop state and render it as the State-Tool response, shared by the Windows and mock servers.'''
+    desktop_state=desktop.get_state(use_vision=use_vision,app_name=app,handle=handle,region=region)
+    interactive_elements=desktop_state.tree_state.interactive_elements_to_string()
+    foreground_app=desktop_state.active_app.name.strip() if desktop_state.active_app else None
+    informative_elements=budgeted_informative_elements_to_string(desktop_state.tree_state,budget=budget,unit=budget_unit,foreground_app=foreground_app)
+    scrollable_elements=desktop_state.tree_state.scrollable_elements_to_string()
+    apps=desktop_state.apps_to_string()
+    active_app=desktop_state.active_app_to_string()
+    # The screenshot is delivered with this response, so the cached state no longer holds it
+    screenshot,desktop_state.screenshot=desktop_state.screenshot,None
+    return [dedent(f'''
+    Focused App:
+    {active_app}
+
+    Opened Apps:
+    {apps}
+
+    List of Interactive Elements:
+    {interactive_elements or 'No interactive elements found.'}
+
+    List of Informative Elements:
+    {informative_elements or 'No informative elements found.'}
+
+    List of Scrollable Elements:
+    {scrollable_elements or 'No scrollable elements found.'}
+    ''')]+([Image(data=screenshot,format='png')] if use_vision else [])
+
+def resolve_loc(desktop:'Desktop',loc:tuple[int,int]|None,label:int|None)->tuple[int,int]:
+    '''Resolve a tool target given as coordinates or as a label from the last State-Tool output.'''
+    if label is not None:
+        node=desktop.get_element_by_label(label)
+        return (node.center.x,node.center.y)
+    if loc is None:
+        raise ValueError('Provide either loc or label.')
+    return tuple(loc)
@@ -1,10 +1,14 @@
 from src.tree.views import TreeElementNode, TextElementNode, ScrollElementNode, Center, BoundingBox, TreeState
-from src.tree.config import INTERACTIVE_CONTROL_TYPE_NAMES,INFORMATIVE_CONTROL_TYPE_NAMES, DEFAULT_ACTIONS
-from uiautomation import GetRootControl,Control,ImageControl,ScrollPattern
-from src.tree.utils import random_point_within_bounding_box
+from src.tree.config import DEFAULT_ACTIONS,FOCUSABLE_CONTROL_TYPE_NAMES,APP_MATCH_CUTOFF
+from uiautomation import GetRootControl,GetFocusedControl,GetScreenSize,ControlFromHandle,ControlsAreSame,Control,ImageControl,ScrollPattern
+from src.tree.utils import random_point_within_bounding_box,get_children
+from src.tree.profiles import PROFILES,AppProfile,NodeRule
+from src.tree.spatial import SpatialIndex
+from src.tree.cdp import CDPExtractor
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.desktop.config import AVOIDED_APPS,EXCLUDED_APPS
 from PIL import Image, ImageFont, ImageDraw
+from fuzzywuzzy import process
 from typing import TYPE_CHECKING
 from time import sleep
 import random
@@ -15,26 +19,90 @@ if TYPE_CHECKING:
 class Tree:
     def __init__(self,desktop:'Desktop'):
         self.desktop=desktop
+        self.cdp=CDPExtractor()
+        self.profiles=PROFILES
 
-    def get_state(self)->TreeState:
+    def get_state(self,app_name:str|None=None,handle:int|None=None,region:BoundingBox|None=None)->TreeState:
         sleep(0.5)
         # Get the root control of the desktop
         root=GetRootControl()
-        interactive_nodes,informative_nodes,scrollable_nodes=self.get_appwise_nodes(node=root)
-        return TreeState(interactive_nodes=interactive_nodes,informative_nodes=informative_nodes,scrollable_nodes=scrollable_nodes)
+        apps=self.get_scoped_apps(node=root,app_name=app_name,handle=handle,region=region)
+        interactive_nodes,informative_nodes,scrollable_nodes=self.get_appwise_nodes(node=root,apps=apps,region=region)
+        screen_width,screen_height=GetScreenSize()
+        viewport=BoundingBox(left=0,top=0,right=screen_width,bottom=screen_height,width=screen_width,height=screen_height)
+        if region is None and (app_name is not None or handle is not None) and len(apps)==1:
+            # Scoped to a single window, so the state only covers that window
+            box=next(iter(apps.values())).BoundingRectangle
+            scope=BoundingBox(left=box.left,top=box.top,right=box.right,bottom=box.bottom,width=box.width(),height=box.height())
+        else:
+            scope=region
+        return TreeState(interactive_nodes=interactive_nodes,informative_nodes=informative_nodes,scrollable_nodes=scrollable_nodes,focus_path=self.get_focus_path(),viewport=viewport,scope=scope)
+
+    def get_scoped_apps(self,node:Control,app_name:str|None=None,handle:int|None=None,region:BoundingBox|None=None)->dict[str,Control]:
+        '''
+        Pick the top-level windows to traverse.
+
+        A window handle wins over an app name, which is fuzzy-matched against the visible apps;
+        a handle or name that matches no window raises a ValueError.
+        With only a region, every visible window is a candidate, background windows included.
+        Without any of them, the taskbar, the desktop and the foreground app are used. A region
+        drops the windows that do not intersect it.
+        '''
+        if handle is not None:
+            try:
+                control=ControlFromHandle(handle)
+            except Exception:
+                # A stale or invalid handle fails inside UI Automation
+                control=None
+            if control is None:
+                raise ValueError(f'Window handle {handle} not found. Call State-Tool without a handle to get the open windows.')
+            apps={control.Name.strip():control}
+        else:
+            all_apps=node.GetChildren()
+            visible_apps = {app.Name: app for app in all_apps if self.desktop.is_app_visible(app) and app.Name not in AVOIDED_APPS}
+            if app_name is not None:
+                matched_app=process.extractOne(app_name,list(visible_apps.keys()),score_cutoff=APP_MATCH_CUTOFF)
+                if matched_app is None:
+                    raise ValueError(f'App {app_name} not found. Call State-Tool without an app to get the open windows.')
+                name,_=matched_app
+                apps={name.strip():visible_apps[name]}
+            elif region is not None:
+                apps={name.strip():app for name,app in visible_apps.items()}
+            else:
+                apps={name:app for name in ['Taskbar','Program Manager'] if (app:=visible_apps.pop(name,None)) is not None}
+                if visible_apps:
+                    foreground_app = list(visible_apps.values()).pop(0)
+                    apps[foreground_app.Name.strip()]=foreground_app
+            del visible_apps
+        if region is not None:
+            apps={name:app for name,app in apps.items() if self.intersects_region(app,region)}
+        return apps
+
+    def intersects_region(self,node:Control,region:BoundingBox)->bool:
+        box=node.BoundingRectangle
+        return box.left<region.right and region.left<box.right and box.top<region.bottom and region.top<box.bottom
+
+    def get_focus_path(self)->list[BoundingBox]:
+        # Bounding boxes of the focused element and its ancestors, innermost first
+        focus_path=[]
+        try:
+            control=GetFocusedControl()
+            while control is not None:
+                box=control.BoundingRectangle
+                if not box.isempty():
+                    focus_path.append(BoundingBox(left=box.left,top=box.top,right=box.right,bottom=box.bottom,width=box.width(),height=box.height()))
+                control=control.GetParentControl()
+        except Exception:
+            pass
+        return focus_path
     
-    def get_appwise_nodes(self,node:Control) -> tuple[list[TreeElementNode],list[TextElementNode]]:
-        all_apps=node.GetChildren()
-        visible_apps = {app.Name: app for app in all_apps if self.desktop.is_app_visible(app) and app.Name not in AVOIDED_APPS}
-        apps={'Taskbar':visible_apps.pop('Taskbar'),'Program Manager':visible_apps.pop('Program Manager')}
-        if visible_apps:
-            foreground_app = list(visible_apps.values()).pop(0)
-            apps[foreground_app.Name.strip()]=foreground_app
-        del visible_apps
+    def get_appwise_nodes(self,node:Control,apps:dict[str,Control]|None=None,region:BoundingBox|None=None) -> tuple[list[TreeElementNode],list[TextElementNode],list[ScrollElementNode]]:
+        if apps is None:
+            apps=self.get_scoped_apps(node=node,region=region)
         interactive_nodes,informative_nodes,scrollable_nodes=[],[],[]
         # Parallel traversal (using ThreadPoolExecutor) to get nodes from each app
         with ThreadPoolExecutor() as executor:
-            future_to_node = {executor.submit(self.get_nodes, app): app for app in apps.values()}
+            future_to_node = {executor.submit(self.get_nodes, app, region=region): app for app in apps.values()}
             for future in as_completed(future_to_node):
                 try:
                     result = future.result()
@@ -47,14 +115,21 @@ class Tree:
                     print(f"Error processing node {future_to_node[future].Name}: {e}")
         return interactive_nodes,informative_nodes,scrollable_nodes
 
-    def get_nodes(self, node: Control, is_browser=False) -> tuple[list[TreeElementNode],list[TextElementNode],list[ScrollElementNode]]:
+    def get_nodes(self, node: Control, is_browser=False, region:BoundingBox|None=None) -> tuple[list[TreeElementNode],list[TextElementNode],list[ScrollElementNode]]:
         app_name=node.Name.strip()
         app_name='Desktop' if app_name=='Program Manager' else app_name
         window_width,window_height=node.BoundingRectangle.width(),node.BoundingRectangle.height()
         is_browser=self.desktop.is_app_browser(node)
+        profile=self.get_profile(node)
         interactive_nodes, informative_nodes, scrollable_nodes = [], [], []
+        browser_nodes=self.get_browser_nodes(node,app_name,(window_width,window_height)) if is_browser else None
+        page_document=None
+        if browser_nodes is not None:
+            page_document,page_interactive_nodes,page_informative_nodes=browser_nodes
+            interactive_nodes.extend(page_interactive_nodes)
+            informative_nodes.extend(page_informative_nodes)
         
-        def is_element_visible(node:Control,threshold:int=0):
+        def is_element_visible(node:Control,control_type_name:str,threshold:int=0):
             is_control=node.IsControlElement
             box=node.BoundingRectangle
             if box.isempty():
@@ -62,7 +137,7 @@ class Tree:
             width=box.width()
             height=box.height()
             area=width*height
-            is_offscreen=(not node.IsOffscreen) or node.ControlTypeName in ['EditControl']
+            is_offscreen=(not node.IsOffscreen) or control_type_name=='EditControl'
             return area > threshold and is_offscreen and is_control
     
         def is_element_enabled(node:Control):
@@ -84,10 +159,10 @@ class Tree:
                     return True
             return False
         
-        def is_element_text(node:Control):
+        def is_element_text(node:Control,control_type_name:str,rule:NodeRule):
             try:
-                if node.ControlTypeName in INFORMATIVE_CONTROL_TYPE_NAMES:
-                    if is_element_visible(node) and is_element_enabled(node) and not is_element_image(node):
+                if rule.is_informative:
+                    if is_element_visible(node,control_type_name) and is_element_enabled(node) and not is_element_image(node):
                         return True
             except Exception:
                 return False
@@ -100,9 +175,9 @@ class Tree:
             except Exception:
                 return False
             
-        def is_keyboard_focusable(node:Control):
+        def is_keyboard_focusable(node:Control,control_type_name:str):
             try:
-                if node.ControlTypeName in set(['EditControl','ButtonControl','CheckBoxControl','RadioButtonControl','TabItemControl']):
+                if control_type_name in FOCUSABLE_CONTROL_TYPE_NAMES:
                     return True
                 return node.IsKeyboardFocusable
             except Exception:
@@ -115,34 +190,34 @@ class Tree:
                     return False
                 return first_child.LocalizedControlType==child_control_type
             
-        def group_has_no_name(node:Control):
+        def group_has_no_name(node:Control,control_type_name:str):
             try:
-                if node.ControlTypeName=='GroupControl':
+                if control_type_name=='GroupControl':
                     if not node.Name.strip():
                         return True
                 return False
             except Exception:
                 return False
             
-        def is_element_interactive(node:Control):
+        def is_element_interactive(node:Control,control_type_name:str,rule:NodeRule):
             try:
-                if node.ControlTypeName in INTERACTIVE_CONTROL_TYPE_NAMES:
-                    if is_element_visible(node) and is_element_enabled(node) and not is_element_image(node) and is_keyboard_focusable(node):
+                if rule.is_interactive:
+                    if is_element_visible(node,control_type_name) and is_element_enabled(node) and not is_element_image(node) and is_keyboard_focusable(node,control_type_name):
                         return True
-                elif node.ControlTypeName=='GroupControl' and is_browser:
-                    if is_element_visible(node) and is_element_enabled(node) and (is_default_action(node) or is_keyboard_focusable(node)):
+                elif control_type_name=='GroupControl' and is_browser:
+                    if is_element_visible(node,control_type_name) and is_element_enabled(node) and (is_default_action(node) or is_keyboard_focusable(node,control_type_name)):
                         return True
             except Exception:
                 return False
             return False
         
-        def dom_correction(node:Control):
+        def dom_correction(node:Control,control_type_name:str):
             if element_has_child_element(node,'list item','link') or element_has_child_element(node,'item','link'):
                 interactive_nodes.pop()
                 return None
-            elif group_has_no_name(node):
+            elif group_has_no_name(node,control_type_name):
                 interactive_nodes.pop()
-                if is_keyboard_focusable(node):
+                if is_keyboard_focusable(node,control_type_name):
                     child=node
                     try:
                         while child.GetFirstChildControl() is not None:
@@ -182,7 +257,15 @@ class Tree:
                 ))
             
         def tree_traversal(node: Control):
-            if is_element_interactive(node):
+            # Prune subtrees lying outside the requested region
+            if region is not None and not self.intersects_region(node,region):
+                return None
+            # One read of the control type and one lookup in the app's profile classify the node
+            control_type_name=node.ControlTypeName
+            rule=profile.get_rule(control_type_name)
+            if rule.skip and rule.is_skipped(node):
+                return None
+            if is_element_interactive(node,control_type_name,rule):
                 box = node.BoundingRectangle
                 x,y=random_point_within_bounding_box(node=node,window_size=(window_width,window_height),scale_factor=0.8)
                 center = Center(x=x,y=y)
@@ -196,11 +279,13 @@ class Tree:
                     app_window=(window_width,window_height)
                 ))
                 if is_browser:
-                    dom_correction(node)
-            elif is_element_text(node):
+                    dom_correction(node,control_type_name)
+            elif is_element_text(node,control_type_name,rule):
+                box = node.BoundingRectangle
                 informative_nodes.append(TextElementNode(
                     name=node.Name.strip() or "''",
-                    app_name=app_name
+                    app_name=app_name,
+                    bounding_box=BoundingBox(left=box.left,top=box.top,right=box.right,bottom=box.bottom,width=box.width(),height=box.height())
                 ))
             elif is_element_scrollable(node):
                 scroll_pattern:ScrollPattern=node.GetScrollPattern()
@@ -217,17 +302,51 @@ class Tree:
                     horizontal_scrollable=scroll_pattern.HorizontallyScrollable,
                     vertical_scrollable=scroll_pattern.VerticallyScrollable
                 ))
-            # Recursively check all children
-            for child in node.GetChildren():
+            # The page content already came from the DevTools protocol, other documents (such as docked DevTools) did not
+            if page_document is not None and control_type_name=='DocumentControl' and ControlsAreSame(node,page_document):
+                return None
+            # Recursively check the children, up to the cap the profile sets for this container
+            children,truncated=get_children(node,rule.max_children)
+            for child in children:
                 tree_traversal(child)
+            if truncated:
+                # Tell the agent the container holds more than was read, as the ranking does for dropped elements
+                box=node.BoundingRectangle
+                informative_nodes.append(TextElementNode(
+                    name=f'... more items in {node.Name.strip() or node.LocalizedControlType.title()} omitted after the first {rule.max_children}',
+                    app_name=app_name,
+                    bounding_box=BoundingBox(left=box.left,top=box.top,right=box.right,bottom=box.bottom,width=box.width(),height=box.height())
+                ))
         tree_traversal(node)
         return (interactive_nodes,informative_nodes,scrollable_nodes)
     
+    def get_browser_nodes(self,node:Control,app_name:str,app_window:tuple[int,int])->tuple[Control,list[TreeElementNode],list[TextElementNode]]|None:
+        # Returns the document control the page was read for, along with its elements
+        if not self.cdp.is_enabled():
+            return None
+        try:
+            document=node.DocumentControl()
+            if not document.Exists(maxSearchSeconds=0):
+                return None
+            box=document.BoundingRectangle
+            viewport=BoundingBox(left=box.left,top=box.top,right=box.right,bottom=box.bottom,width=box.width(),height=box.height())
+        except Exception:
+            return None
+        page_nodes=self.cdp.extract(title=node.Name,viewport=viewport,app_name=app_name,app_window=app_window)
+        if page_nodes is None:
+            return None
+        return (document,*page_nodes)
+
+    def get_profile(self,node:Control)->AppProfile:
+        return self.profiles.match(class_name=node.ClassName,process_name=self.desktop.processes.get_name(node.ProcessId))
+
     def get_random_color(self):
         return "#{:06x}".format(random.randint(0, 0xFFFFFF))
 
-    def annotated_screenshot(self, nodes: list[TreeElementNode],scale:float=0.7) -> Image.Image:
-        screenshot = self.desktop.get_screenshot(scale=scale)
+    def annotated_screenshot(self, nodes: list[TreeElementNode],scale:float=0.7,region:BoundingBox|None=None) -> Image.Image:
+        screenshot = self.desktop.get_screenshot(scale=scale,region=region)
+        # Boxes are in screen coordinates, so shift them to the origin of the captured region
+        offset_x,offset_y=(region.left,region.top) if region is not None else (0,0)
         sleep(0.25)
         # Add padding
         padding = 20
@@ -246,47 +365,60 @@ class Tree:
         def get_random_color():
             return "#{:06x}".format(random.randint(0, 0xFFFFFF))
 
-        def draw_annotation(label, node: TreeElementNode):
+        def get_adjusted_box(node: TreeElementNode):
             box = node.bounding_box
             window_width,window_height=node.app_window
-            color = get_random_color()
 
             # Scale and pad the bounding box also clip the bounding box
+            left,top,right,bottom=box.left-offset_x,box.top-offset_y,box.right-offset_x,box.bottom-offset_y
             if node.app_name not in EXCLUDED_APPS:
-                adjusted_box = (
-                    max(int(box.left * scale) + padding,0),
-                    max(int(box.top * scale) + padding,0),
-                    min(int(box.right * scale) + padding,window_width-1),
-                    min(int(box.bottom * scale) + padding,window_height-1)
-                )
-            else:
-                adjusted_box = (
-                    int(box.left * scale) + padding,
-                    int(box.top * scale) + padding,
-                    int(box.right * scale) + padding,
-                    int(box.bottom * scale) + padding
+                return (
+                    max(int(left * scale) + padding,0),
+                    max(int(top * scale) + padding,0),
+                    min(int(right * scale) + padding,window_width-1),
+                    min(int(bottom * scale) + padding,window_height-1)
                 )
-            # Draw bounding box
-            draw.rectangle(adjusted_box, outline=color, width=2)
+            return (
+                int(left * scale) + padding,
+                int(top * scale) + padding,
+                int(right * scale) + padding,
+                int(bottom * scale) + padding
+            )
 
+        def place_label(label, adjusted_box):
             # Label dimensions
-            label_width = draw.textlength(str(label), font=font)
-            label_height = font_size
+            label_width = int(draw.textlength(str(label), font=font))
+            label_height = font_size + 4
             left, top, right, bottom = adjusted_box
 
-            # Label position above bounding box
-            label_x1 = right - label_width
-            label_y1 = top - label_height - 4
-            label_x2 = label_x1 + label_width
-            label_y2 = label_y1 + label_height + 4
+            # Prefer above the bounding box, then the other corners, to avoid covering earlier labels
+            candidates = [
+                (right - label_width, top - label_height),
+                (left, top - label_height),
+                (right - label_width, bottom),
+                (left, top)
+            ]
+            label_boxes = [BoundingBox(left=x,top=y,right=x+label_width,bottom=y+label_height,width=label_width,height=label_height) for x, y in candidates]
+            label_box = next((label_box for label_box in label_boxes if not label_index.query_rect(label_box)), label_boxes[0])
+            label_index.insert(label, label_box)
+            return label_box
 
+        def draw_annotation(label, adjusted_box, label_box: BoundingBox):
+            color = get_random_color()
+            # Draw bounding box
+            draw.rectangle(adjusted_box, outline=color, width=2)
             # Draw label background and text
-            draw.rectangle([(label_x1, label_y1), (label_x2, label_y2)], fill=color)
-            draw.text((label_x1 + 2, label_y1 + 2), str(label), fill=(255, 255, 255), font=font)
+            draw.rectangle([(label_box.left, label_box.top), (label_box.right, label_box.bottom)], fill=color)
+            draw.text((label_box.left + 2, label_box.top + 2), str(label), fill=(255, 255, 255), font=font)
+
+        # Place labels one after another so each can avoid the ones before it
+        label_index = SpatialIndex()
+        adjusted_boxes = [get_adjusted_box(node) for node in nodes]
+        label_boxes = [place_label(label, adjusted_box) for label, adjusted_box in enumerate(adjusted_boxes)]
 
         # Draw annotations in parallel
         with ThreadPoolExecutor() as executor:
-            executor.map(draw_annotation, range(len(nodes)), nodes)
+            executor.map(draw_annotation, range(len(nodes)), adjusted_boxes, label_boxes)
         return padded_screenshot
     
     def get_annotated_image_data(self)->tuple[Image.Image,list[TreeElementNode]]:
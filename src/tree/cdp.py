@@ -0,0 +1,135 @@
+from src.tree.config import CDP_HOST,CDP_PORT,CDP_TIMEOUT,CDP_INTERACTIVE_ROLES,CDP_INFORMATIVE_ROLES
+from src.tree.views import TreeElementNode, TextElementNode, BoundingBox, Center
+import requests
+import json
+
+try:
+    import websocket
+except ImportError:
+    websocket=None
+
+METRICS_EXPRESSION='JSON.stringify({innerWidth:window.innerWidth,scrollX:window.scrollX,scrollY:window.scrollY})'
+
+class CDPExtractor:
+    '''
+    Reads a browser page's accessibility tree over the Chrome DevTools Protocol.
+
+    The whole tree comes back from one `Accessibility.getFullAXTree` request and the layout of
+    every node from one `DOMSnapshot.captureSnapshot` request, replacing the node-by-node walk
+    of the page through UI Automation. Any failure returns None so the caller can fall back to UIA.
+    '''
+    def __init__(self,host:str=CDP_HOST,port:int|None=CDP_PORT,timeout:float=CDP_TIMEOUT):
+        self.host=host
+        self.port=port
+        self.timeout=timeout
+
+    def is_enabled(self)->bool:
+        return self.port is not None and websocket is not None
+
+    def get_target(self,title:str)->dict|None:
+        response=requests.get(f'http://{self.host}:{self.port}/json/list',timeout=self.timeout)
+        pages=[target for target in response.json() if target.get('type')=='page' and target.get('webSocketDebuggerUrl')]
+        # The browser window is titled after its active tab, e.g. "Example Domain - Google Chrome"
+        matches=[page for page in pages if page.get('title') and title.startswith(page['title'])]
+        if matches:
+            return max(matches,key=lambda page:len(page['title']))
+        return None
+
+    def send_commands(self,url:str,commands:list[tuple[str,dict]])->list[dict]:
+        connection=websocket.create_connection(url,timeout=self.timeout,suppress_origin=True)
+        try:
+            for id,(method,params) in enumerate(commands,start=1):
+                connection.send(json.dumps({'id':id,'method':method,'params':params}))
+            results={}
+            while len(results)<len(commands):
+                message=json.loads(connection.recv())
+                # Skip protocol events, which carry no id
+                if 'id' not in message:
+                    continue
+                if 'error' in message:
+                    raise RuntimeError(message['error'].get('message','DevTools protocol error'))
+                results[message['id']]=message.get('result',{})
+            return [results[id] for id in range(1,len(commands)+1)]
+        finally:
+            connection.close()
+
+    def get_layout(self,snapshot:dict)->dict[int,list[float]]:
+        # Bounds of each laid-out node of the main frame, keyed by backend DOM node id
+        documents=snapshot.get('documents',[])
+        if not documents:
+            return {}
+        document=documents[0]
+        backend_node_ids=document['nodes']['backendNodeId']
+        layout=document['layout']
+        return {backend_node_ids[node_index]:bounds for node_index,bounds in zip(layout['nodeIndex'],layout['bounds'])}
+
+    def extract(self,title:str,viewport:BoundingBox,app_name:str,app_window:tuple[int,int])->tuple[list[TreeElementNode],list[TextElementNode]]|None:
+        '''
+        Get the interactive and informative elements of the page shown in a browser window.
+
+        Args:
+            title: Title of the browser window, used to pick the tab.
+            viewport: Screen rectangle of the page content, from the window's document control.
+            app_name: App name recorded on the elements.
+            app_window: Size of the browser window.
+
+        Returns:
+            The interactive and informative elements in screen coordinates, or None when the
+            protocol is disabled or unreachable.
+        '''
+        if not self.is_enabled():
+            return None
+        try:
+            target=self.get_target(title)
+            if target is None:
+                return None
+            ax_tree,snapshot,metrics=self.send_commands(target['webSocketDebuggerUrl'],[
+                ('Accessibility.getFullAXTree',{}),
+                ('DOMSnapshot.captureSnapshot',{'computedStyles':[]}),
+                ('Runtime.evaluate',{'expression':METRICS_EXPRESSION,'returnByValue':True})
+            ])
+            metrics=json.loads(metrics['result']['value'])
+            layout=self.get_layout(snapshot)
+        except Exception:
+            return None
+        # Physical pixels per CSS pixel, covering both the display scaling and the page zoom
+        scale=viewport.width/metrics['innerWidth'] if metrics.get('innerWidth') else 1.0
+        nodes={node['nodeId']:node for node in ax_tree.get('nodes',[])}
+        interactive_nodes,informative_nodes=[],[]
+        for node in nodes.values():
+            if node.get('ignored'):
+                continue
+            role=node.get('role',{}).get('value','')
+            is_interactive=role in CDP_INTERACTIVE_ROLES
+            if not is_interactive and role not in CDP_INFORMATIVE_ROLES:
+                continue
+            bounds=layout.get(node.get('backendDOMNodeId'))
+            if bounds is None:
+                continue
+            x,y,width,height=bounds
+            left=int(viewport.left+(x-metrics['scrollX'])*scale)
+            top=int(viewport.top+(y-metrics['scrollY'])*scale)
+            box=BoundingBox(left=left,top=top,right=left+int(width*scale),bottom=top+int(height*scale),width=int(width*scale),height=int(height*scale))
+            if box.width*box.height==0 or not box.intersects(viewport):
+                continue
+            name=str(node.get('name',{}).get('value','')).strip()
+            if is_interactive:
+                properties={property['name']:property.get('value',{}).get('value') for property in node.get('properties',[])}
+                if properties.get('disabled'):
+                    continue
+                interactive_nodes.append(TreeElementNode(
+                    name=name or "''",
+                    control_type=role.title(),
+                    shortcut=properties.get('keyshortcuts') or "''",
+                    bounding_box=box,
+                    center=Center(x=(box.left+box.right)//2,y=(box.top+box.bottom)//2),
+                    app_name=app_name,
+                    app_window=app_window
+                ))
+            else:
+                # Text runs repeat the name of the link or button they label
+                parent=nodes.get(node.get('parentId'))
+                if parent is not None and parent.get('role',{}).get('value') in CDP_INTERACTIVE_ROLES and str(parent.get('name',{}).get('value','')).strip()==name:
+                    continue
+                informative_nodes.append(TextElementNode(name=name or "''",app_name=app_name,bounding_box=box))
+        return interactive_nodes,informative_nodes
@@ -1,3 +1,5 @@
+import os
+
 INTERACTIVE_CONTROL_TYPE_NAMES=set([
     'ButtonControl','ListItemControl','MenuItemControl','DocumentControl',
     'EditControl','CheckBoxControl', 'RadioButtonControl','ComboBoxControl',
@@ -10,6 +12,59 @@ DEFAULT_ACTIONS=set([
     'Click','Press','Jump','Check','Uncheck','Double Click'
 ])
 
+# Control types taken as keyboard focusable without asking UI Automation
+FOCUSABLE_CONTROL_TYPE_NAMES=set([
+    'EditControl','ButtonControl','CheckBoxControl','RadioButtonControl','TabItemControl'
+])
+
 INFORMATIVE_CONTROL_TYPE_NAMES=set([
     'TextControl','ImageControl'
-])
\ No newline at end of file
+])
+
+SPATIAL_CELL_SIZE=64
+
+SPATIAL_MAX_CELLS=256
+
+# Minimum fuzzy match score for an app name to select a window
+APP_MATCH_CUTOFF=70
+
+# DevTools protocol endpoint of the browser, enabled by starting it with --remote-debugging-port
+CDP_HOST=os.environ.get('WINDOWS_MCP_CDP_HOST','127.0.0.1')
+
+CDP_PORT=int(os.environ['WINDOWS_MCP_CDP_PORT']) if os.environ.get('WINDOWS_MCP_CDP_PORT') else None
+
+CDP_TIMEOUT=2.0
+
+CDP_INTERACTIVE_ROLES=set([
+    'button','link','textbox','searchbox','checkbox','radio','combobox',
+    'menuitem','menuitemcheckbox','menuitemradio','tab','option','switch',
+    'slider','spinbutton','treeitem','listbox','gridcell','columnheader'
+])
+
+CDP_INFORMATIVE_ROLES=set([
+    'StaticText','heading'
+])
+
+# Per-app traversal profiles, matched by the window class of the app, then by its process name.
+# The profile without class_names or process_names applies to every other app.
+# skip: subtrees not walked, each rule matching on control_type and any of class_name, name and
+# automation_id (a rule without control_type is checked on every node of the app).
+# max_children: cap on the children walked per container control type.
+# interactive/informative: control types classified for the app, defaulting to the sets above.
+APP_PROFILES=[
+    {
+        'name':'Default',
+        'max_children':{'DataGridControl':100,'TableControl':100}
+    },
+    {
+        'name':'File Explorer',
+        'class_names':['CabinetWClass'],
+        'max_children':{'ListControl':150,'TreeControl':150,'DataGridControl':100,'TableControl':100}
+    },
+    {
+        'name':'Microsoft Office',
+        'process_names':['winword.exe','excel.exe','powerpnt.exe','outlook.exe','onenote.exe'],
+        'skip':[{'control_type':'ToolBarControl','class_name':'MsoCommandBar','name':'Ribbon'}],
+        'max_children':{'DataGridControl':100,'TableControl':100}
+    }
+]
@@ -0,0 +1,97 @@
+from src.tree.config import APP_PROFILES,INTERACTIVE_CONTROL_TYPE_NAMES,INFORMATIVE_CONTROL_TYPE_NAMES
+from dataclasses import dataclass,field
+from typing import Any
+
+INTERACTIVE=1
+INFORMATIVE=2
+
+@dataclass(frozen=True)
+class SkipRule:
+    class_name:str|None=None
+    name:str|None=None
+    automation_id:str|None=None
+
+    def matches(self,node:Any)->bool:
+        # Each attribute is only read from the node when the rule constrains it
+        return (self.class_name is None or node.ClassName==self.class_name) and \
+            (self.name is None or node.Name==self.name) and \
+            (self.automation_id is None or node.AutomationId==self.automation_id)
+
+@dataclass(frozen=True)
+class NodeRule:
+    kind:int=0
+    skip:tuple[SkipRule,...]=()
+    max_children:int|None=None
+
+    @property
+    def is_interactive(self)->bool:
+        return bool(self.kind&INTERACTIVE)
+
+    @property
+    def is_informative(self)->bool:
+        return bool(self.kind&INFORMATIVE)
+
+    def is_skipped(self,node:Any)->bool:
+        return any(rule.matches(node) for rule in self.skip)
+
+@dataclass
+class AppProfile:
+    name:str
+    rules:dict[str,NodeRule]=field(default_factory=dict)
+    default_rule:NodeRule=field(default_factory=NodeRule)
+
+    def get_rule(self,control_type_name:str)->NodeRule:
+        return self.rules.get(control_type_name,self.default_rule)
+
+@dataclass
+class ProfileTable:
+    default:AppProfile
+    by_class_name:dict[str,AppProfile]=field(default_factory=dict)
+    by_process_name:dict[str,AppProfile]=field(default_factory=dict)
+
+    def match(self,class_name:str='',process_name:str='')->AppProfile:
+        profile=self.by_class_name.get(class_name)
+        if profile is None:
+            profile=self.by_process_name.get(process_name.lower(),self.default)
+        return profile
+
+def compile_profile(spec:dict)->AppProfile:
+    '''
+    Compile a declarative app profile into a table keyed by control type name.
+
+    Every control type the profile mentions gets one NodeRule holding its classification bits,
+    its skip rules and its child cap, so traversal classifies a node with a single lookup.
+    Control types the profile never mentions share the default rule.
+    '''
+    interactive=set(spec.get('interactive',INTERACTIVE_CONTROL_TYPE_NAMES))
+    informative=set(spec.get('informative',INFORMATIVE_CONTROL_TYPE_NAMES))
+    max_children:dict[str,int]=spec.get('max_children',{})
+    any_type_skips,typed_skips=[],{}
+    for skip in spec.get('skip',[]):
+        rule=SkipRule(class_name=skip.get('class_name'),name=skip.get('name'),automation_id=skip.get('automation_id'))
+        control_type=skip.get('control_type')
+        if control_type is None:
+            any_type_skips.append(rule)
+        else:
+            typed_skips.setdefault(control_type,[]).append(rule)
+    rules={}
+    for control_type in interactive|informative|set(max_children)|set(typed_skips):
+        kind=(INTERACTIVE if control_type in interactive else 0)|(INFORMATIVE if control_type in informative else 0)
+        skip=tuple(typed_skips.get(control_type,[])+any_type_skips)
+        rules[control_type]=NodeRule(kind=kind,skip=skip,max_children=max_children.get(control_type))
+    return AppProfile(name=spec.get('name',''),rules=rules,default_rule=NodeRule(skip=tuple(any_type_skips)))
+
+def compile_profiles(specs:list[dict])->ProfileTable:
+    default_spec=next((spec for spec in specs if not spec.get('class_names') and not spec.get('process_names')),{'name':'Default'})
+    table=ProfileTable(default=compile_profile(default_spec))
+    for spec in specs:
+        if spec is default_spec:
+            continue
+        profile=compile_profile(spec)
+        for class_name in spec.get('class_names',[]):
+            table.by_class_name[class_name]=profile
+        for process_name in spec.get('process_names',[]):
+            table.by_process_name[process_name.lower()]=profile
+    return table
+
+PROFILES=compile_profiles(APP_PROFILES)
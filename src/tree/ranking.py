@@ -0,0 +1,137 @@
+from src.tree.views import TreeState, TextElementNode, BoundingBox
+from typing import Literal,Optional
+from dataclasses import dataclass
+
+# Apps whose text is mostly chrome rather than content ('Desktop' is how Program Manager is named)
+NOISY_APP_NAMES=set(['Taskbar','Desktop'])
+
+MAX_FOCUS_SCORE=3
+MAX_SCORE=4+2+MAX_FOCUS_SCORE
+
+@dataclass
+class RankedElement:
+    node:TextElementNode
+    index:int
+    count:int
+    score:int=0
+
+    def to_string(self)->str:
+        repeat=f' (x{self.count})' if self.count>1 else ''
+        return f'App Name: {self.node.app_name} Name: {self.node.name}{repeat}'
+
+def deduplicate_nodes(nodes:list[TextElementNode])->list[RankedElement]:
+    '''
+    Collapse identical names within the same app into one element and drop unnamed ones.
+
+    The first occurrence keeps its position and bounding box, the rest only bump its count.
+    '''
+    elements:dict[tuple[str,str],RankedElement]={}
+    for index,node in enumerate(nodes):
+        if node.name in ('',"''"):
+            continue
+        key=(node.app_name,node.name)
+        element=elements.get(key)
+        if element is None:
+            elements[key]=RankedElement(node=node,index=index,count=1)
+        else:
+            element.count+=1
+    return list(elements.values())
+
+def score_element(element:RankedElement,foreground_app:Optional[str],viewport:Optional[BoundingBox],focus_path:list[BoundingBox])->int:
+    node=element.node
+    # Foreground app first, then other apps, then taskbar and desktop noise
+    if node.app_name in NOISY_APP_NAMES:
+        score=0
+    elif foreground_app is not None and node.app_name==foreground_app:
+        score=4
+    else:
+        score=2
+    box=node.bounding_box
+    if box is None:
+        return score+1
+    x,y=(box.left+box.right)//2,(box.top+box.bottom)//2
+    # Viewport proximity: inside, within one viewport of it, or far away
+    if viewport is None or viewport.contains(x,y):
+        score+=2
+    elif viewport.left-viewport.width<=x<=viewport.right+viewport.width and viewport.top-viewport.height<=y<=viewport.bottom+viewport.height:
+        score+=1
+    # Focus ancestry: how many of the focused element's ancestors contain this element
+    focus_score=0
+    for focus_box in focus_path:
+        if focus_box.contains(x,y):
+            focus_score+=1
+            if focus_score==MAX_FOCUS_SCORE:
+                break
+    return score+focus_score
+
+def rank_informative_nodes(tree_state:TreeState,foreground_app:Optional[str]=None)->list[RankedElement]:
+    '''
+    Deduplicate and order the informative elements by relevance, highest first.
+
+    Scores are small integers so the ordering is a bucket sort, linear in the number of elements.
+    Ties keep their traversal order.
+    '''
+    buckets:list[list[RankedElement]]=[[] for _ in range(MAX_SCORE+1)]
+    focus_path=tree_state.focus_path[:MAX_FOCUS_SCORE+2]
+    for element in deduplicate_nodes(tree_state.informative_nodes):
+        element.score=score_element(element,foreground_app,tree_state.viewport,focus_path)
+        buckets[element.score].append(element)
+    return [element for bucket in reversed(buckets) for element in bucket]
+
+def estimate_size(text:str,unit:Literal['chars','tokens'])->int:
+    if unit=='tokens':
+        # Rough estimate of about four characters per token
+        return (len(text)+3)//4
+    return len(text)
+
+def omitted_line(count:int,app_name:Optional[str]=None)->str:
+    source=f' from {app_name}' if app_name is not None else ''
+    return f'... {count} more elements{source} omitted'
+
+def budgeted_informative_elements_to_string(tree_state:TreeState,budget:Optional[int]=None,unit:Literal['chars','tokens']='chars',foreground_app:Optional[str]=None)->str:
+    '''
+    Render the informative elements within a character or token budget.
+
+    Elements are admitted in ranked order until the budget is spent, then printed in their
+    original traversal order. Every app that lost elements gets a summary line at the end, or a
+    single summary line for all of them when the per-app lines do not fit. The summary lines
+    count against the budget, which keeps room for one of them whenever elements are dropped.
+
+    Args:
+        tree_state: The tree state holding the informative elements.
+        budget: Maximum size of the rendered elements, or None for no limit.
+        unit: Whether the budget counts characters or estimated tokens.
+        foreground_app: Name of the focused app, whose elements rank highest.
+
+    Returns:
+        The rendered elements, one per line, followed by the summary lines.
+    '''
+    ranked=rank_informative_nodes(tree_state,foreground_app=foreground_app)
+    newline=1 if unit=='chars' else 0
+    lines=[element.to_string() for element in ranked]
+    sizes=[estimate_size(line,unit)+newline for line in lines]
+    if budget is None or sum(sizes)<=budget:
+        # Everything fits, so only the traversal order needs restoring
+        selected:list[str|None]=[None]*len(tree_state.informative_nodes)
+        for element,line in zip(ranked,lines):
+            selected[element.index]=line
+        return '\n'.join([line for line in selected if line is not None])
+    # Elements are dropped, so keep room for the combined summary line at its largest
+    reserve=estimate_size(omitted_line(len(ranked)),unit)+newline
+    selected=[None]*len(tree_state.informative_nodes)
+    dropped:dict[str,int]={}
+    used=0
+    for element,line,size in zip(ranked,lines,sizes):
+        if used+size+reserve<=budget:
+            selected[element.index]=line
+            used+=size
+        else:
+            dropped[element.node.app_name]=dropped.get(element.node.app_name,0)+1
+    lines=[line for line in selected if line is not None]
+    summary=[omitted_line(count,app_name) for app_name,count in dropped.items()]
+    if used+sum(estimate_size(line,unit)+newline for line in summary)>budget:
+        summary=[omitted_line(sum(dropped.values()))]
+        if used+estimate_size(summary[0],unit)+newline>budget:
+            # The budget is too small for even the combined summary line
+            summary=[]
+    return '\n'.join(lines+summary)
@@ -0,0 +1,74 @@
+from src.tree.views import TreeState, TreeElementNode, ScrollElementNode, BoundingBox
+from src.tree.config import SPATIAL_CELL_SIZE,SPATIAL_MAX_CELLS
+from typing import Generic,TypeVar,Optional
+from collections import defaultdict
+
+T=TypeVar('T')
+
+class SpatialIndex(Generic[T]):
+    '''
+    Uniform grid over bounding boxes for point and rectangle queries.
+
+    Each box is registered in every cell it overlaps, so a query only looks at the boxes sharing
+    its cells. Boxes spanning more than `max_cells` cells (whole windows, panes) go to a grid with
+    cells `coarse_factor` times larger, and the rare box too big even for that is kept in a short
+    list checked on every query.
+    '''
+    def __init__(self,cell_size:int=SPATIAL_CELL_SIZE,max_cells:int=SPATIAL_MAX_CELLS,coarse_factor:int=16):
+        self.max_cells=max_cells
+        self.grids:list[tuple[int,dict[tuple[int,int],list[int]]]]=[(cell_size,defaultdict(list)),(cell_size*coarse_factor,defaultdict(list))]
+        self.oversized:list[int]=[]
+        self.items:list[T]=[]
+        self.boxes:list[BoundingBox]=[]
+
+    def __len__(self)->int:
+        return len(self.items)
+
+    def get_cell_range(self,box:BoundingBox,cell_size:int)->tuple[range,range]:
+        return range(box.left//cell_size,box.right//cell_size+1),range(box.top//cell_size,box.bottom//cell_size+1)
+
+    def insert(self,item:T,box:BoundingBox):
+        index=len(self.items)
+        self.items.append(item)
+        self.boxes.append(box)
+        for cell_size,cells in self.grids:
+            columns,rows=self.get_cell_range(box,cell_size)
+            if len(columns)*len(rows)<=self.max_cells:
+                for column in columns:
+                    for row in rows:
+                        cells[(column,row)].append(index)
+                return None
+        self.oversized.append(index)
+
+    def query_point(self,x:int,y:int)->list[T]:
+        '''Return the items whose box contains the point, smallest box first.'''
+        candidates=[*self.oversized]
+        for cell_size,cells in self.grids:
+            candidates.extend(cells.get((x//cell_size,y//cell_size),[]))
+        indices=[index for index in candidates if self.boxes[index].contains(x,y)]
+        indices.sort(key=lambda index:self.boxes[index].width*self.boxes[index].height)
+        return [self.items[index] for index in indices]
+
+    def query_rect(self,box:BoundingBox)->list[T]:
+        '''Return the items whose box intersects the rectangle, in insertion order.'''
+        seen=set(self.oversized)
+        for cell_size,cells in self.grids:
+            columns,rows=self.get_cell_range(box,cell_size)
+            for column in columns:
+                for row in rows:
+                    seen.update(cells.get((column,row),[]))
+        return [self.items[index] for index in sorted(seen) if self.boxes[index].intersects(box)]
+
+    def find(self,x:int,y:int)->Optional[T]:
+        '''Return the innermost item at the point, if any.'''
+        items=self.query_point(x,y)
+        return items[0] if items else None
+
+    @classmethod
+    def from_tree_state(cls,tree_state:TreeState)->'SpatialIndex[tuple[int,TreeElementNode|ScrollElementNode]]':
+        '''Index the interactive and scrollable elements under the labels State-Tool reports for them.'''
+        index=cls()
+        nodes=[*tree_state.interactive_nodes,*tree_state.scrollable_nodes]
+        for label,node in enumerate(nodes):
+            index.insert((label,node),node.bounding_box)
+        return index
@@ -32,4 +32,25 @@ def random_point_within_bounding_box(node: Control, scale_factor: float = 1.0, w
     # Generate random point around center point
     x = random.randint(int(center_x - scaled_width / 2), int(center_x + scaled_width / 2))
     y = random.randint(int(center_y - scaled_height / 2), int(center_y + scaled_height / 2))
-    return (x, y)
\ No newline at end of file
+    return (x, y)
+
+def get_children(node: Control, limit: int | None = None) -> tuple[list[Control], bool]:
+    """
+    Get the children of a node, stopping after the first `limit` of them.
+
+    Args:
+        node (Control): The parent node
+        limit (int, optional): The maximum number of children to fetch. Defaults to None (all children).
+
+    Returns:
+        tuple: The children of the node in order, and whether children past the limit were left out
+    """
+    if limit is None:
+        return node.GetChildren(), False
+    # Walk the siblings one by one so the children past the limit are never fetched
+    children = []
+    child = node.GetFirstChildControl()
+    while child is not None and len(children) < limit:
+        children.append(child)
+        child = child.GetNextSiblingControl()
+    return children, child is not None
@@ -1,17 +1,18 @@
 from dataclasses import dataclass,field
+from typing import Optional
 
 @dataclass
 class TreeState:
     interactive_nodes:list['TreeElementNode']=field(default_factory=list)
     informative_nodes:list['TextElementNode']=field(default_factory=list)
     scrollable_nodes:list['ScrollElementNode']=field(default_factory=list)
+    focus_path:list['BoundingBox']=field(default_factory=list)
+    viewport:Optional['BoundingBox']=None
+    scope:Optional['BoundingBox']=None
 
     def interactive_elements_to_string(self)->str:
         return '\n'.join([f'Label: {index} App Name: {node.app_name} ControlType: {f'{node.control_type} Control'} Name: {node.name} Shortcut: {node.shortcut} Cordinates: {node.center.to_string()}' for index,node in enumerate(self.interactive_nodes)])
     
-    def informative_elements_to_string(self)->str:
-        return '\n'.join([f'App Name: {node.app_name} Name: {node.name}' for node in self.informative_nodes])
-    
     def scrollable_elements_to_string(self)->str:
         n=len(self.interactive_nodes)
         return '\n'.join([f'Label: {n+index} App Name: {node.app_name} ControlType: {f'{node.control_type} Control'} Name: {node.name} Cordinates: {node.center.to_string()} Horizontal Scrollable: {node.horizontal_scrollable} Vertical Scrollable: {node.vertical_scrollable}' for index,node in enumerate(self.scrollable_nodes)])
@@ -37,6 +38,12 @@ class BoundingBox:
         x2,y2=self.left+self.width,self.top+self.height
         return x1,y1,x2,y2
 
+    def contains(self,x:int,y:int)->bool:
+        return self.left<=x<=self.right and self.top<=y<=self.bottom
+
+    def intersects(self,other:'BoundingBox')->bool:
+        return self.left<other.right and other.left<self.right and self.top<other.bottom and other.top<self.bottom
+
 @dataclass
 class Center:
     x:int
@@ -59,6 +66,7 @@ class TreeElementNode:
 class TextElementNode:
     name:str
     app_name:str
+    bounding_box:Optional[BoundingBox]=None
 
 @dataclass
 class ScrollElementNode:
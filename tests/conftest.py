@@ -0,0 +1,13 @@
+from unittest.mock import MagicMock
+from pathlib import Path
+import sys
+
+sys.path.insert(0,str(Path(__file__).resolve().parent.parent))
+if sys.platform!='win32':
+    # Mock the Windows-only modules before anything imports them, as in main_linux.py
+    for module in ['uiautomation','pyautogui','pyperclip','humancursor','live_inspect.watch_cursor']:
+        sys.modules.setdefault(module,MagicMock())
+    # The traversal checks isinstance against ImageControl, which has to be a class
+    sys.modules['uiautomation'].ImageControl=type('ImageControl',(),{})
+
+from src.desktop import Desktop  # noqa: E402,F401 (imported first to resolve the desktop/tree import cycle)
@@ -0,0 +1,89 @@
+from src.tree.views import BoundingBox
+from src.tree.cdp import CDPExtractor
+from pathlib import Path
+import threading
+import pytest
+import json
+
+# Provided by the dev extra, so a missing package fails the run instead of skipping the test
+from websockets.sync import server
+from websockets.http11 import Response
+from websockets.datastructures import Headers
+
+pytestmark=pytest.mark.integration
+
+FIXTURE=json.loads((Path(__file__).resolve().parent.parent/'fixtures'/'cdp'/'example_page.json').read_text())
+
+class FakeCDPServer:
+    '''Serves /json/list and answers DevTools protocol commands with a recorded page.'''
+    def __init__(self,fixture:dict):
+        self.fixture=fixture
+        self.methods=[]
+        self.server=server.serve(self.handle,'127.0.0.1',0,process_request=self.process_request)
+        self.port=self.server.socket.getsockname()[1]
+        self.thread=threading.Thread(target=self.server.serve_forever,daemon=True)
+
+    def process_request(self,connection,request):
+        if request.path!='/json/list':
+            return None
+        targets=[{**target,'webSocketDebuggerUrl':f'ws://127.0.0.1:{self.port}/devtools/page/{target["id"]}'} for target in self.fixture['targets'] if target['type']=='page']
+        targets.extend(target for target in self.fixture['targets'] if target['type']!='page')
+        body=json.dumps(targets).encode()
+        return Response(200,'OK',Headers([('Content-Type','application/json'),('Content-Length',str(len(body)))]),body)
+
+    def handle(self,connection):
+        assert connection.request.path=='/devtools/page/PAGE1'
+        for message in connection:
+            command=json.loads(message)
+            self.methods.append(command['method'])
+            # Protocol events arrive between responses and must be skipped
+            connection.send(json.dumps({'method':'Page.frameNavigated','params':{}}))
+            if command['method']=='Runtime.evaluate':
+                result={'result':{'type':'string','value':json.dumps(self.fixture['metrics'])}}
+            else:
+                result=self.fixture[command['method']]
+            connection.send(json.dumps({'id':command['id'],'result':result}))
+
+    def __enter__(self)->'FakeCDPServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self,*args):
+        self.server.shutdown()
+        self.thread.join()
+
+@pytest.fixture
+def cdp_server():
+    with FakeCDPServer(FIXTURE) as cdp_server:
+        yield cdp_server
+
+# Page content at (100,150) on screen, 1600 physical pixels wide for 1280 CSS pixels
+VIEWPORT=BoundingBox(left=100,top=150,right=1700,bottom=950,width=1600,height=800)
+
+def test_extracts_the_page_in_screen_coordinates(cdp_server):
+    extractor=CDPExtractor(port=cdp_server.port)
+    interactive_nodes,informative_nodes=extractor.extract(title='Example Domain - Google Chrome',viewport=VIEWPORT,app_name='Google Chrome',app_window=(1920,1080))
+    assert cdp_server.methods==['Accessibility.getFullAXTree','DOMSnapshot.captureSnapshot','Runtime.evaluate']
+    # The disabled button, the link scrolled out of view and the ignored node are left out
+    assert [(node.name,node.control_type) for node in interactive_nodes]==[('More information...','Link'),('Search','Textbox')]
+    link,search=interactive_nodes
+    assert (link.bounding_box.left,link.bounding_box.top,link.bounding_box.width,link.bounding_box.height)==(150,300,200,25)
+    assert (link.center.x,link.center.y)==(250,312)
+    assert (search.bounding_box.left,search.bounding_box.top)==(350,400)
+    assert search.shortcut=='Alt+S'
+    # The text run repeating the link name is dropped, the heading is kept
+    assert [node.name for node in informative_nodes]==['Example Domain']
+    assert (informative_nodes[0].bounding_box.left,informative_nodes[0].bounding_box.top)==(150,200)
+
+def test_unknown_tab_falls_back_to_uia(cdp_server):
+    extractor=CDPExtractor(port=cdp_server.port)
+    assert extractor.extract(title='New Tab - Google Chrome',viewport=VIEWPORT,app_name='Google Chrome',app_window=(1920,1080)) is None
+
+def test_unreachable_endpoint_falls_back_to_uia(cdp_server):
+    port=cdp_server.port
+    cdp_server.server.shutdown()
+    extractor=CDPExtractor(port=port,timeout=0.5)
+    assert extractor.extract(title='Example Domain - Google Chrome',viewport=VIEWPORT,app_name='Google Chrome',app_window=(1920,1080)) is None
+
+def test_disabled_without_a_port():
+    assert not CDPExtractor(port=None).is_enabled()
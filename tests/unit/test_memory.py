@@ -0,0 +1,79 @@
+from src.memory import MemoryGovernor,SlotCache
+from src.memory.utils import get_deep_size
+import src.memory
+from main_linux import MockDesktop
+from src import tools
+import psutil
+import pytest
+import gc
+
+def test_cache_limit_evicts_least_recently_used():
+    governor=MemoryGovernor(max_rss=2**40,max_cache_size=2**40,tracemalloc_frames=0)
+    old,new=SlotCache(),SlotCache()
+    governor.register('old',old)
+    governor.register('new',new)
+    old.set(b'x'*100_000)
+    new.set(b'y'*100_000)
+    governor.max_cache_size=150_000
+    assert governor.enforce()==1
+    assert old.get() is None
+    assert new.get() is not None
+
+def test_rss_limit_keeps_the_entries_of_the_current_call(monkeypatch):
+    desktop=MockDesktop(num_elements=100)
+    # Python seldom returns memory to the OS, so the RSS stays over the limit on every call
+    monkeypatch.setattr(desktop.governor,'get_rss',lambda:2*2**30)
+    desktop.governor.max_rss=2**30
+    for _ in range(3):
+        tools.state_tool(desktop)
+        assert desktop.desktop_state is not None
+        assert desktop.get_element_by_label(0) is desktop.desktop_state.tree_state.interactive_nodes[0]
+        assert desktop.switch_app('Chrome')[0]!='No desktop state available. Call State-Tool first.'
+
+def test_rss_limit_evicts_entries_older_than_the_call():
+    governor=MemoryGovernor(max_rss=0,tracemalloc_frames=0)
+    old,current=SlotCache(),SlotCache()
+    governor.register('old',old)
+    governor.register('current',current)
+    old.set('previous call')
+    current.set('this call')
+    governor.enforce(since=current.last_used())
+    assert old.get() is None
+    assert current.get()=='this call'
+    # Without a start time every cache is emptied
+    governor.enforce()
+    assert current.get() is None
+
+def test_enforce_uses_the_sizes_measured_on_store(monkeypatch):
+    desktop=MockDesktop(num_elements=100)
+    tools.state_tool(desktop)
+    sizes={name:cache.memory_size() for name,cache in desktop.governor.caches.items()}
+    assert all(sizes.values())
+    # Checking the limits must not walk the cached state again
+    def get_deep_size(obj,seen=None,sample=None):
+        raise AssertionError('cache re-measured during enforce')
+    monkeypatch.setattr(src.memory,'get_deep_size',get_deep_size)
+    monkeypatch.setattr('src.desktop.processes.get_deep_size',get_deep_size)
+    desktop.governor.enforce()
+    assert desktop.governor.sizes==sizes
+
+def test_long_lists_are_sized_from_a_sample():
+    desktop=MockDesktop(num_elements=5000)
+    desktop_state=desktop.get_state()
+    exact,sampled=get_deep_size(desktop_state,sample=0),get_deep_size(desktop_state)
+    assert abs(sampled-exact)<0.15*exact
+
+@pytest.mark.slow
+def test_rss_is_flat_over_10k_state_calls():
+    desktop=MockDesktop()
+    process=psutil.Process()
+    for _ in range(1_000):
+        tools.state_tool(desktop,budget=2000)
+    gc.collect()
+    start=process.memory_info().rss
+    for _ in range(9_000):
+        tools.state_tool(desktop,budget=2000)
+    gc.collect()
+    growth=process.memory_info().rss-start
+    assert growth<16*2**20,f'RSS grew by {growth/2**20:.1f}MB over 9000 State-Tool calls'
+    assert desktop.desktop_state is not None
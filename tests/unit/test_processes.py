@@ -0,0 +1,96 @@
+from src.desktop.processes import ProcessCache
+from types import SimpleNamespace
+import psutil
+import os
+
+class FakeProcess:
+    def __init__(self,pid:int,create_time:float,name:str):
+        self.info={'pid':pid,'name':name,'exe':f'C:\\{name}','create_time':create_time}
+
+def fake_psutil(monkeypatch,processes:dict[int,tuple[float,str]])->SimpleNamespace:
+    '''Serve process_iter and Process from a mutable pid -> (create_time, name) table, counting scans.'''
+    calls=SimpleNamespace(scans=0,checks=0)
+    def process_iter(attrs=None,ad_value=None):
+        calls.scans+=1
+        return [FakeProcess(pid,create_time,name) for pid,(create_time,name) in processes.items()]
+    def process(pid:int):
+        calls.checks+=1
+        if pid not in processes:
+            raise psutil.NoSuchProcess(pid)
+        return SimpleNamespace(create_time=lambda:processes[pid][0])
+    monkeypatch.setattr(psutil,'process_iter',process_iter)
+    monkeypatch.setattr(psutil,'Process',process)
+    return calls
+
+def test_resolves_the_current_process():
+    cache=ProcessCache()
+    cache.refresh()
+    info=cache.get(os.getpid())
+    assert info is not None
+    assert info.key==(os.getpid(),psutil.Process().create_time())
+    assert info.name==psutil.Process().name()
+
+def test_scans_once_per_cycle(monkeypatch):
+    calls=fake_psutil(monkeypatch,{10:(1.0,'notepad.exe'),20:(2.0,'explorer.exe')})
+    cache=ProcessCache(ttl=60)
+    cache.refresh()
+    for _ in range(5):
+        assert cache.get_name(10)=='notepad.exe'
+        assert cache.get_name(20)=='explorer.exe'
+    cache.refresh()
+    assert cache.get_name(10)=='notepad.exe'
+    # Within the TTL a new cycle reuses the snapshot without any per-process call
+    assert calls.scans==1
+    assert calls.checks==0
+
+def test_miss_rescans_once_per_cycle(monkeypatch):
+    processes={10:(1.0,'notepad.exe')}
+    calls=fake_psutil(monkeypatch,processes)
+    cache=ProcessCache(ttl=60)
+    cache.refresh()
+    processes[30]=(3.0,'chrome.exe')
+    # The cycle that scanned on refresh does not scan again on a miss
+    assert cache.get(30) is None
+    assert calls.scans==1
+    cache.refresh()
+    assert cache.get_name(30)=='chrome.exe'
+    assert calls.scans==2
+    assert cache.get(40) is None
+    assert cache.get(41) is None
+    assert calls.scans==2
+    cache.refresh()
+    assert cache.get(40) is None
+    assert calls.scans==3
+
+def test_reused_pid_is_not_served_from_the_old_process(monkeypatch):
+    processes={10:(1.0,'notepad.exe')}
+    fake_psutil(monkeypatch,processes)
+    cache=ProcessCache(ttl=0)
+    cache.refresh()
+    assert cache.get_name(10)=='notepad.exe'
+    # Notepad exits and its PID goes to a new process before the next scan
+    processes[10]=(5.0,'calc.exe')
+    cache.refresh()
+    info=cache.get(10)
+    assert info.name=='calc.exe'
+    assert info.key==(10,5.0)
+    assert (10,1.0) not in cache.processes
+
+def test_exited_process_is_dropped(monkeypatch):
+    processes={10:(1.0,'notepad.exe')}
+    fake_psutil(monkeypatch,processes)
+    cache=ProcessCache(ttl=0)
+    cache.refresh()
+    del processes[10]
+    cache.refresh()
+    assert cache.get(10) is None
+    assert len(cache)==0
+
+def test_evicts_least_recently_used(monkeypatch):
+    fake_psutil(monkeypatch,{10:(1.0,'notepad.exe'),20:(2.0,'explorer.exe')})
+    cache=ProcessCache(ttl=60)
+    cache.refresh()
+    cache.get(20)
+    assert cache.evict_oldest()
+    assert list(cache.processes)==[(20,2.0)]
+    assert cache.get_name(20)=='explorer.exe'
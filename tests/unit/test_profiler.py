@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+from src.profiler import profile_call,profiled
+from pathlib import Path
+import asyncio
+import json
+
+def busy_worker(iterations:int)->int:
+    total=0
+    for index in range(iterations):
+        total+=index*index%7
+    return total
+
+def threaded_workload(workers:int=4,iterations:int=400_000)->int:
+    # Shaped like get_appwise_nodes: the caller blocks on a pool while the workers do the work
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(busy_worker,[iterations]*workers))
+
+def test_hot_functions_cover_worker_threads(tmp_path):
+    result,profile_result=profile_call('Threaded',threaded_workload,(),{},directory=str(tmp_path))
+    assert result==threaded_workload(workers=4,iterations=400_000)
+    top=profile_result.hot_functions[0]
+    assert top.function.startswith('busy_worker (test_profiler.py')
+    # The caller's wait on the pool is not reported as the hot spot
+    assert not any('acquire' in function.function or function.function.startswith('wait (') for function in profile_result.hot_functions[:3])
+    assert top.total_time>profile_result.duration*0.5
+    summary=json.loads(Path(profile_result.summary_path).read_text())
+    assert summary['hot_functions'][0]['function']==top.function
+    collapsed=Path(profile_result.collapsed_path).read_text()
+    assert 'busy_worker' in collapsed
+    assert Path(profile_result.pstats_path).exists()
+
+def test_short_calls_fall_back_to_cprofile(tmp_path):
+    _,profile_result=profile_call('Short',busy_worker,(10,),{},directory=str(tmp_path))
+    assert any(function.function.startswith('busy_worker') and function.calls==1 for function in profile_result.hot_functions)
+
+def test_unprofiled_tools_run_unwrapped():
+    def tool()->str:
+        return 'done'
+    assert profiled('Unprofiled-Tool')(tool) is tool
+
+def test_state_tool_profile_on_the_mock_backend(tmp_path,monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from main_linux import mcp
+    from fastmcp import Client
+
+    async def call_state_tool()->list[str]:
+        async with Client(mcp) as client:
+            profiled_result=await client.call_tool('State-Tool',{'profile':True})
+            plain_result=await client.call_tool('State-Tool',{})
+        return [profiled_result[0].text,plain_result[0].text]
+
+    profiled_text,plain_text=asyncio.run(call_state_tool())
+    assert 'List of Interactive Elements:' in profiled_text
+    assert 'Profiled State-Tool in' in profiled_text
+    assert len(list((tmp_path/'data'/'profiles').glob('*-State-Tool.*')))==3
+    # Without profile=True the output carries no profile
+    assert 'Profiled State-Tool' not in plain_text
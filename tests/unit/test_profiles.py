@@ -0,0 +1,39 @@
+from src.tree.profiles import compile_profiles,INTERACTIVE,INFORMATIVE
+from types import SimpleNamespace
+
+SPECS=[
+    {'name':'Default','max_children':{'DataGridControl':100}},
+    {
+        'name':'Custom',
+        'process_names':['Custom.exe'],
+        'class_names':['CustomWindow'],
+        'skip':[{'control_type':'PaneControl','name':'Ads'},{'automation_id':'Banner'}],
+        'interactive':['ButtonControl'],
+        'informative':['TextControl','ButtonControl']
+    }
+]
+
+def test_compiled_rules_classify_with_one_lookup():
+    table=compile_profiles(SPECS)
+    profile=table.match(process_name='custom.exe')
+    assert profile.name=='Custom'
+    assert profile.get_rule('ButtonControl').kind==INTERACTIVE|INFORMATIVE
+    assert profile.get_rule('TextControl').kind==INFORMATIVE
+    # Control types the profile does not mention share the default rule
+    assert profile.get_rule('EditControl') is profile.default_rule
+    assert profile.get_rule('EditControl').kind==0
+
+def test_skip_rules_match_on_every_given_attribute():
+    profile=compile_profiles(SPECS).match(class_name='CustomWindow')
+    pane=profile.get_rule('PaneControl')
+    assert pane.is_skipped(SimpleNamespace(Name='Ads',ClassName='',AutomationId=''))
+    assert not pane.is_skipped(SimpleNamespace(Name='Content',ClassName='',AutomationId=''))
+    # A rule without control_type applies to every control type
+    assert profile.get_rule('EditControl').is_skipped(SimpleNamespace(Name='',ClassName='',AutomationId='Banner'))
+
+def test_unmatched_apps_get_the_default_profile():
+    table=compile_profiles(SPECS)
+    profile=table.match(class_name='Notepad',process_name='notepad.exe')
+    assert profile.name=='Default'
+    assert profile.get_rule('DataGridControl').max_children==100
+    assert profile.get_rule('ButtonControl').is_interactive
@@ -0,0 +1,55 @@
+from src.tree.ranking import budgeted_informative_elements_to_string,rank_informative_nodes,estimate_size
+from src.tree.views import TreeState,TextElementNode,BoundingBox
+from time import perf_counter
+import random
+import pytest
+
+def box(left:int,top:int,width:int=100,height:int=20)->BoundingBox:
+    return BoundingBox(left=left,top=top,right=left+width,bottom=top+height,width=width,height=height)
+
+def make_state(count:int,seed:int=0)->TreeState:
+    rng=random.Random(seed)
+    apps=['Notepad','Google Chrome','Taskbar','Desktop']
+    nodes=[TextElementNode(name=f'Text {rng.randrange(count)}',app_name=rng.choice(apps),bounding_box=box(rng.randrange(3840),rng.randrange(2160))) for _ in range(count)]
+    return TreeState(informative_nodes=nodes,viewport=box(0,0,1920,1080),focus_path=[box(0,0,960,540),box(0,0,1920,1080)])
+
+def test_unlimited_budget_keeps_traversal_order_and_collapses_duplicates():
+    nodes=[TextElementNode(name=name,app_name=app_name) for name,app_name in [('File','Notepad'),('Start','Taskbar'),('File','Notepad'),("''",'Notepad'),('Edit','Notepad')]]
+    output=budgeted_informative_elements_to_string(TreeState(informative_nodes=nodes),foreground_app='Notepad')
+    assert output.splitlines()==['App Name: Notepad Name: File (x2)','App Name: Taskbar Name: Start','App Name: Notepad Name: Edit']
+
+def test_foreground_app_ranks_first():
+    nodes=[TextElementNode(name='Start',app_name='Taskbar'),TextElementNode(name='Body',app_name='Notepad')]
+    ranked=rank_informative_nodes(TreeState(informative_nodes=nodes),foreground_app='Notepad')
+    assert [element.node.name for element in ranked]==['Body','Start']
+
+@pytest.mark.parametrize('unit',['chars','tokens'])
+def test_output_never_exceeds_the_budget(unit):
+    state=make_state(300)
+    full=budgeted_informative_elements_to_string(state,unit=unit,foreground_app='Notepad')
+    for budget in list(range(0,200,7))+list(range(200,estimate_size(full,unit)+50,97)):
+        output=budgeted_informative_elements_to_string(state,budget=budget,unit=unit,foreground_app='Notepad')
+        size=len(output) if unit=='chars' else sum(estimate_size(line,unit) for line in output.splitlines())
+        assert size<=budget,(budget,output)
+
+def test_zero_budget_renders_nothing():
+    assert budgeted_informative_elements_to_string(make_state(50),budget=0)==''
+
+def test_dropped_elements_are_summarised():
+    output=budgeted_informative_elements_to_string(make_state(300),budget=2000,foreground_app='Notepad')
+    assert 'more elements' in output.splitlines()[-1]
+    assert len(output)<=2000
+
+def test_ranking_is_linear():
+    def best_time(count:int)->float:
+        state=make_state(count)
+        times=[]
+        for _ in range(3):
+            start=perf_counter()
+            budgeted_informative_elements_to_string(state,budget=count*10,foreground_app='Notepad')
+            times.append(perf_counter()-start)
+        return min(times)
+    small,large=best_time(5_000),best_time(50_000)
+    # Ten times the elements should take about ten times as long, far from the hundredfold of a quadratic pass
+    assert large<small*30,(small,large)
+    assert large<2.0
@@ -0,0 +1,82 @@
+from src.tree.views import BoundingBox,TreeElementNode,Center
+from src.tree.spatial import SpatialIndex
+from types import SimpleNamespace
+from PIL import Image
+from src.tree import Tree
+import src.tree
+import random
+
+def box(left:int,top:int,right:int,bottom:int)->BoundingBox:
+    return BoundingBox(left=left,top=top,right=right,bottom=bottom,width=right-left,height=bottom-top)
+
+def random_box(rng:random.Random)->BoundingBox:
+    # Mostly control-sized boxes with the occasional pane or window, across two monitors
+    if rng.random()<0.05:
+        width,height=rng.randint(400,3840),rng.randint(300,2160)
+    else:
+        width,height=rng.randint(8,200),rng.randint(8,60)
+    left,top=rng.randint(-1920,1920-width),rng.randint(-200,2160-height)
+    return box(left,top,left+width,top+height)
+
+def test_find_returns_the_innermost_box():
+    index=SpatialIndex()
+    index.insert('window',box(0,0,1920,1080))
+    index.insert('pane',box(100,100,900,900))
+    index.insert('button',box(200,200,260,230))
+    assert index.find(210,210)=='button'
+    assert index.find(500,500)=='pane'
+    assert index.find(1500,1000)=='window'
+    assert index.find(2000,1000) is None
+    assert index.query_point(210,210)==['button','pane','window']
+
+def test_queries_match_a_linear_scan():
+    rng=random.Random(0)
+    boxes=[random_box(rng) for _ in range(2000)]
+    index=SpatialIndex()
+    for label,item_box in enumerate(boxes):
+        index.insert(label,item_box)
+    for _ in range(200):
+        x,y=rng.randint(-1920,1920),rng.randint(-200,2160)
+        assert set(index.query_point(x,y))=={label for label,item_box in enumerate(boxes) if item_box.contains(x,y)}
+        rect=random_box(rng)
+        assert index.query_rect(rect)==[label for label,item_box in enumerate(boxes) if item_box.intersects(rect)]
+
+def test_large_boxes_go_to_the_coarse_grid_and_oversized():
+    index=SpatialIndex(cell_size=10,max_cells=4,coarse_factor=10)
+    index.insert('small',box(0,0,15,15))
+    index.insert('coarse',box(0,0,150,150))
+    index.insert('oversized',box(0,0,1500,1500))
+    fine,coarse=[cells for _,cells in index.grids]
+    assert {index.items[i] for indices in fine.values() for i in indices}=={'small'}
+    assert {index.items[i] for indices in coarse.values() for i in indices}=={'coarse'}
+    assert [index.items[i] for i in index.oversized]==['oversized']
+    assert index.query_point(5,5)==['small','coarse','oversized']
+    assert index.query_point(120,120)==['coarse','oversized']
+    assert index.query_rect(box(1000,1000,1100,1100))==['oversized']
+
+def test_negative_coordinates():
+    # A monitor to the left of and above the primary one
+    index=SpatialIndex()
+    index.insert('left',box(-1920,0,-1800,40))
+    index.insert('straddling',box(-50,-50,50,50))
+    index.insert('primary',box(10,10,60,60))
+    assert index.find(-1900,20)=='left'
+    assert index.find(-10,-10)=='straddling'
+    assert index.find(20,20)=='primary'
+    assert index.query_rect(box(-2000,-100,0,100))==['left','straddling']
+
+def test_overlapping_labels_move_to_another_corner(monkeypatch):
+    placed=[]
+    class RecordingIndex(SpatialIndex):
+        def insert(self,item,item_box:BoundingBox):
+            placed.append(item_box)
+            super().insert(item,item_box)
+    monkeypatch.setattr(src.tree,'SpatialIndex',RecordingIndex)
+    monkeypatch.setattr(src.tree,'sleep',lambda seconds:None)
+    desktop=SimpleNamespace(get_screenshot=lambda scale,region:Image.new('RGB',(960,540)))
+    node=TreeElementNode(name='OK',control_type='Button',shortcut='',bounding_box=box(400,400,600,500),center=Center(x=500,y=450),app_name='Notepad',app_window=(1920,1080))
+    Tree(desktop).annotated_screenshot(nodes=[node,node,node],scale=0.5)
+    assert len(placed)==3
+    # The same element three times gets its labels at three different corners that do not overlap
+    assert len({(label_box.left,label_box.top) for label_box in placed})==3
+    assert not any(first.intersects(second) for i,first in enumerate(placed) for second in placed[i+1:])
@@ -0,0 +1,44 @@
+from main_linux import MockDesktop
+from src import tools
+import pytest
+
+def test_mock_layout_is_seeded():
+    first,second=MockDesktop(num_elements=100,seed=7),MockDesktop(num_elements=100,seed=7)
+    for _ in range(3):
+        assert first.get_state()==second.get_state()
+    assert MockDesktop(num_elements=100,seed=8).get_state()!=MockDesktop(num_elements=100,seed=7).get_state()
+
+def test_state_tool_renders_every_section():
+    desktop=MockDesktop(num_elements=100)
+    text,=tools.state_tool(desktop,budget=200)
+    for section in ['Focused App:','Opened Apps:','List of Interactive Elements:','List of Informative Elements:','List of Scrollable Elements:']:
+        assert section in text
+
+def test_state_tool_scopes_by_handle_and_region():
+    desktop=MockDesktop(num_elements=200)
+    tools.state_tool(desktop,handle=1,region=(0,0,960,540))
+    tree_state=desktop.desktop_state.tree_state
+    assert tree_state.interactive_nodes
+    assert all(node.app_name=='Google Chrome' for node in tree_state.interactive_nodes)
+    assert all(node.bounding_box.left<960 and node.bounding_box.top<540 for node in tree_state.interactive_nodes)
+
+def test_state_tool_rejects_unknown_scopes():
+    desktop=MockDesktop(num_elements=100)
+    with pytest.raises(ValueError,match='Window handle 9 not found'):
+        tools.state_tool(desktop,handle=9)
+    with pytest.raises(ValueError,match='App Spotify not found'):
+        tools.state_tool(desktop,app='Spotify')
+    for region in [(500,500,100,100),(0,0,0,100)]:
+        with pytest.raises(ValueError,match='Invalid region'):
+            tools.state_tool(desktop,region=region,use_vision=True)
+
+def test_resolve_loc_by_label_and_coordinates():
+    desktop=MockDesktop(num_elements=100)
+    tools.state_tool(desktop)
+    node=desktop.desktop_state.tree_state.interactive_nodes[0]
+    assert tools.resolve_loc(desktop,None,0)==(node.center.x,node.center.y)
+    assert tools.resolve_loc(desktop,[10,20],None)==(10,20)
+    with pytest.raises(ValueError):
+        tools.resolve_loc(desktop,None,None)
+    with pytest.raises(ValueError):
+        tools.resolve_loc(desktop,None,10_000)
@@ -0,0 +1,172 @@
+from src.tree.views import BoundingBox
+from types import SimpleNamespace
+from src.tree import Tree
+import src.tree
+import pytest
+
+class FakeRect:
+    def __init__(self,left:int,top:int,right:int,bottom:int):
+        self.left,self.top,self.right,self.bottom=left,top,right,bottom
+
+    def width(self)->int:
+        return self.right-self.left
+
+    def height(self)->int:
+        return self.bottom-self.top
+
+    def isempty(self)->bool:
+        return self.width()<=0 or self.height()<=0
+
+    def xcenter(self)->int:
+        return (self.left+self.right)//2
+
+    def ycenter(self)->int:
+        return (self.top+self.bottom)//2
+
+class FakeControl:
+    '''A UI Automation control with the properties the traversal reads.'''
+    def __init__(self,control_type:str,name:str='',class_name:str='',box:tuple[int,int,int,int]=(0,0,100,20),children:list['FakeControl']|None=None,process_id:int=0):
+        self.ControlTypeName=control_type
+        self.LocalizedControlType=control_type.removesuffix('Control').lower()
+        self.Name=name
+        self.ClassName=class_name
+        self.AutomationId=''
+        self.AcceleratorKey=''
+        self.BoundingRectangle=FakeRect(*box)
+        self.IsControlElement=True
+        self.IsOffscreen=False
+        self.IsEnabled=True
+        self.IsKeyboardFocusable=control_type in ('ButtonControl','EditControl','ListItemControl','HyperlinkControl')
+        self.ProcessId=process_id
+        self.children=children or []
+        self.next_sibling=None
+        for child,sibling in zip(self.children,self.children[1:]):
+            child.next_sibling=sibling
+
+    def GetChildren(self)->list['FakeControl']:
+        return list(self.children)
+
+    def GetFirstChildControl(self)->'FakeControl|None':
+        return self.children[0] if self.children else None
+
+    def GetNextSiblingControl(self)->'FakeControl|None':
+        return self.next_sibling
+
+    def GetScrollPattern(self):
+        return SimpleNamespace(VerticallyScrollable=False,HorizontallyScrollable=False)
+
+    def GetLegacyIAccessiblePattern(self):
+        return SimpleNamespace(DefaultAction='')
+
+def fake_desktop(process_name:str='',is_browser:bool=False)->SimpleNamespace:
+    return SimpleNamespace(is_app_visible=lambda app:True,is_app_browser=lambda node:is_browser,processes=SimpleNamespace(get_name=lambda pid:process_name))
+
+def names(nodes)->list[str]:
+    return [node.name for node in nodes]
+
+def window(name:str,box:tuple[int,int,int,int])->SimpleNamespace:
+    return SimpleNamespace(Name=name,BoundingRectangle=FakeRect(*box))
+
+def region(left:int,top:int,right:int,bottom:int)->BoundingBox:
+    return BoundingBox(left=left,top=top,right=right,bottom=bottom,width=right-left,height=bottom-top)
+
+@pytest.fixture
+def tree()->Tree:
+    return Tree(SimpleNamespace(is_app_visible=lambda app:True))
+
+@pytest.fixture
+def root()->SimpleNamespace:
+    # Side by side windows, with the foreground one on the left
+    windows=[window('Taskbar',(0,1040,1920,1080)),window('Notepad',(0,0,960,1040)),window('Calculator',(960,0,1920,1040)),window('Program Manager',(0,0,1920,1080))]
+    return SimpleNamespace(GetChildren=lambda:windows)
+
+def test_default_scope_is_taskbar_desktop_and_foreground(tree,root):
+    assert set(tree.get_scoped_apps(root))=={'Taskbar','Program Manager','Notepad'}
+
+def test_region_includes_background_windows(tree,root):
+    assert set(tree.get_scoped_apps(root,region=region(1200,100,1600,500)))=={'Calculator','Program Manager'}
+
+def test_app_name_is_fuzzy_matched(tree,root):
+    assert set(tree.get_scoped_apps(root,app_name='calc'))=={'Calculator'}
+
+def test_app_that_is_not_open_is_reported(tree,root):
+    with pytest.raises(ValueError,match='App Spotify not found'):
+        tree.get_scoped_apps(root,app_name='Spotify')
+
+def test_stale_handle_is_reported(tree,root,monkeypatch):
+    def control_from_handle(handle:int):
+        raise OSError('COM error: invalid window handle')
+    monkeypatch.setattr(src.tree,'ControlFromHandle',control_from_handle)
+    with pytest.raises(ValueError,match='Window handle 42 not found'):
+        tree.get_scoped_apps(root,handle=42)
+    monkeypatch.setattr(src.tree,'ControlFromHandle',lambda handle:None)
+    with pytest.raises(ValueError,match='Window handle 42 not found'):
+        tree.get_scoped_apps(root,handle=42)
+
+def test_only_the_document_read_over_cdp_is_pruned(monkeypatch):
+    page=FakeControl('DocumentControl','Example Domain',box=(0,100,1200,1000),children=[FakeControl('ButtonControl','Page Button',box=(10,200,110,220))])
+    devtools=FakeControl('DocumentControl','DevTools',box=(1200,100,1920,1000),children=[FakeControl('ButtonControl','Elements',box=(1210,110,1300,130))])
+    browser=FakeControl('WindowControl','Example Domain - Google Chrome','Chrome_WidgetWin_1',box=(0,0,1920,1080),children=[FakeControl('ButtonControl','Reload',box=(50,50,80,80)),page,devtools])
+    tree=Tree(fake_desktop('chrome.exe',is_browser=True))
+    monkeypatch.setattr(src.tree,'ControlsAreSame',lambda first,second:first is second)
+    monkeypatch.setattr(tree,'get_browser_nodes',lambda node,app_name,app_window:(page,[SimpleNamespace(name='CDP Button')],[]))
+    interactive_nodes,_,_=tree.get_nodes(browser)
+    assert names(interactive_nodes)==['CDP Button','Reload','Elements']
+
+def test_browser_without_cdp_walks_every_document(monkeypatch):
+    page=FakeControl('DocumentControl','Example Domain',box=(0,100,1200,1000),children=[FakeControl('ButtonControl','Page Button',box=(10,200,110,220))])
+    browser=FakeControl('WindowControl','Example Domain - Google Chrome','Chrome_WidgetWin_1',box=(0,0,1920,1080),children=[page])
+    tree=Tree(fake_desktop('chrome.exe',is_browser=True))
+    monkeypatch.setattr(tree,'get_browser_nodes',lambda node,app_name,app_window:None)
+    interactive_nodes,_,_=tree.get_nodes(browser)
+    assert names(interactive_nodes)==['Page Button']
+
+def grid(rows:int)->FakeControl:
+    return FakeControl('DataGridControl','Orders',box=(0,100,1920,1000),children=[FakeControl('ListItemControl',f'Row {index}',box=(0,100+index,1920,120+index)) for index in range(rows)])
+
+def test_capped_container_reports_the_omitted_children():
+    app=FakeControl('WindowControl','Orders','WindowsForms10.Window',box=(0,0,1920,1080),children=[grid(250)])
+    interactive_nodes,informative_nodes,_=Tree(fake_desktop('orders.exe')).get_nodes(app)
+    assert names(interactive_nodes)==[f'Row {index}' for index in range(100)]
+    assert names(informative_nodes)==['... more items in Orders omitted after the first 100']
+
+def test_container_within_the_cap_has_no_summary():
+    app=FakeControl('WindowControl','Orders','WindowsForms10.Window',box=(0,0,1920,1080),children=[grid(100)])
+    interactive_nodes,informative_nodes,_=Tree(fake_desktop('orders.exe')).get_nodes(app)
+    assert len(interactive_nodes)==100
+    assert informative_nodes==[]
+
+def test_office_ribbon_is_skipped():
+    ribbon=FakeControl('ToolBarControl','Ribbon','MsoCommandBar',children=[FakeControl('ButtonControl','Bold')])
+    document=FakeControl('DocumentControl','Page 1',box=(100,200,1800,1000),children=[FakeControl('TextControl','Hello')])
+    word=FakeControl('WindowControl','Document1 - Word','OpusApp',box=(0,0,1920,1080),children=[ribbon,document])
+    interactive_nodes,informative_nodes,_=Tree(fake_desktop('WINWORD.EXE')).get_nodes(word)
+    assert interactive_nodes==[]
+    assert names(informative_nodes)==['Hello']
+    # The same toolbar in another app is walked
+    interactive_nodes,_,_=Tree(fake_desktop('notepad.exe')).get_nodes(word)
+    assert names(interactive_nodes)==['Bold']
+
+def test_profiles_match_by_class_then_process():
+    tree=Tree(fake_desktop('explorer.exe'))
+    assert tree.get_profile(FakeControl('WindowControl',class_name='CabinetWClass')).name=='File Explorer'
+    # The taskbar also belongs to explorer.exe but keeps the default profile
+    assert tree.get_profile(FakeControl('PaneControl',class_name='Shell_TrayWnd')).name=='Default'
+    assert Tree(fake_desktop('EXCEL.EXE')).get_profile(FakeControl('WindowControl',class_name='XLMAIN')).name=='Microsoft Office'
+
+def test_control_type_is_read_once_per_node():
+    reads=[]
+    class CountingControl(FakeControl):
+        def __getattribute__(self,name:str):
+            if name=='ControlTypeName':
+                reads.append(id(self))
+            return super().__getattribute__(name)
+    # Browser pages run the DOM correction on every interactive node as well
+    buttons=[CountingControl('ButtonControl',f'Button {index}',box=(0,index*20,100,20+index*20)) for index in range(10)]
+    page=CountingControl('DocumentControl','Example Domain',box=(0,100,1200,1000),children=[CountingControl('GroupControl',children=buttons)])
+    browser=CountingControl('WindowControl','Example Domain - Google Chrome','Chrome_WidgetWin_1',box=(0,0,1920,1080),children=[page])
+    tree=Tree(fake_desktop('chrome.exe',is_browser=True))
+    tree.get_browser_nodes=lambda node,app_name,app_window:None
+    interactive_nodes,_,_=tree.get_nodes(browser)
+    assert names(interactive_nodes)==[f'Button {index}' for index in range(10)]
+    assert len(reads)==len(set(reads))==13
@@ -0,0 +1,124 @@
+from src.desktop.wait import Waiter
+from src.desktop import Desktop
+from types import SimpleNamespace
+import src.desktop
+import pytest
+
+class SimulatedClock:
+    def __init__(self):
+        self.now=0.0
+        self.sleeps=[]
+
+    def __call__(self)->float:
+        return self.now
+
+    def sleep(self,seconds:float):
+        self.sleeps.append(seconds)
+        self.now+=seconds
+
+class FakeControlType:
+    ButtonControl=50000
+    CheckBoxControl=50002
+    ListItemControl=50007
+    WindowControl=50032
+
+class FakeNode:
+    def __init__(self,name:str,control_type:int,children:list['FakeNode']|None=None):
+        self.Name=name
+        self.ControlType=control_type
+        self.ControlTypeName=next(key for key,value in vars(FakeControlType).items() if value==control_type)
+        self.children=children or []
+        self.BoundingRectangle=SimpleNamespace(xcenter=lambda:10,ycenter=lambda:20)
+
+    def walk(self):
+        for child in self.children:
+            yield child
+            yield from child.walk()
+
+def fake_control(clock:SimulatedClock,window:FakeNode,schedule:list[tuple[float,FakeNode]]):
+    '''A stand-in for uiautomation.Control that searches the fake window, adding nodes as the simulated time passes.'''
+    class Control:
+        def __init__(self,searchFromControl:FakeNode,SubName:str|None=None,ControlType:int|None=None):
+            for time,node in schedule:
+                if clock.now>=time and node not in window.children:
+                    window.children.append(node)
+            self.match=next((node for node in searchFromControl.walk() if (SubName is None or SubName in node.Name) and (ControlType is None or node.ControlType==ControlType)),None)
+
+        def Exists(self,maxSearchSeconds:float=0)->bool:
+            return self.match is not None
+
+        def __getattr__(self,name:str):
+            return getattr(self.__dict__['match'],name)
+    return Control
+
+@pytest.fixture
+def clock()->SimulatedClock:
+    return SimulatedClock()
+
+@pytest.fixture
+def window()->FakeNode:
+    return FakeNode('Installer',FakeControlType.WindowControl,[FakeNode('Next',FakeControlType.ButtonControl)])
+
+@pytest.fixture
+def desktop(monkeypatch,clock,window)->Desktop:
+    monkeypatch.setattr(src.desktop,'ControlType',FakeControlType)
+    monkeypatch.setattr(src.desktop,'GetForegroundControl',lambda:window)
+    return Desktop()
+
+def test_waiter_backs_off_up_to_the_ceiling(clock):
+    waiter=Waiter(initial_interval=0.1,max_interval=1.0,backoff=2.0,clock=clock,sleep=clock.sleep)
+    result=waiter.wait(lambda:None,timeout=5.0)
+    assert not result.satisfied
+    assert result.elapsed==pytest.approx(5.0)
+    assert clock.sleeps[:5]==pytest.approx([0.1,0.2,0.4,0.8,1.0])
+    assert max(clock.sleeps)==1.0
+
+def test_waiter_returns_as_soon_as_the_probe_matches(clock):
+    waiter=Waiter(initial_interval=0.1,max_interval=1.0,backoff=2.0,clock=clock,sleep=clock.sleep)
+    result=waiter.wait(lambda:'Done' if clock.now>=0.25 else None,timeout=5.0)
+    assert result.satisfied
+    assert result.element=='Done'
+    assert result.probes==3
+    assert result.elapsed==pytest.approx(0.3)
+
+def test_waiter_never_sleeps_past_the_timeout(clock):
+    waiter=Waiter(initial_interval=0.4,max_interval=1.0,backoff=2.0,clock=clock,sleep=clock.sleep)
+    result=waiter.wait(lambda:None,timeout=1.0)
+    assert result.elapsed==pytest.approx(1.0)
+    assert clock.sleeps==pytest.approx([0.4,0.6])
+
+@pytest.mark.parametrize('control_type',['ListItem','List Item','list item','ListItemControl','listitemcontrol'])
+def test_control_type_names_are_normalised(desktop,control_type):
+    assert desktop.get_control_type(control_type)==FakeControlType.ListItemControl
+
+@pytest.mark.parametrize('control_type',['CheckBox','Check Box','Checkbox'])
+def test_multi_word_control_types(desktop,control_type):
+    assert desktop.get_control_type(control_type)==FakeControlType.CheckBoxControl
+
+def test_unknown_control_type_is_rejected(desktop):
+    with pytest.raises(ValueError,match='Unknown control type'):
+        desktop.get_control_type('Widget')
+
+def test_waits_for_an_element_to_appear(desktop,clock,window,monkeypatch):
+    monkeypatch.setattr(src.desktop,'Control',fake_control(clock,window,[(2.0,FakeNode('Finish',FakeControlType.ButtonControl))]))
+    waiter=Waiter(initial_interval=0.1,max_interval=1.0,backoff=1.5,clock=clock,sleep=clock.sleep)
+    result=desktop.wait_for('appears',name='Finish',control_type='Button',timeout=10,waiter=waiter)
+    assert result.satisfied
+    assert result.element.startswith('Finish Element with ControlType ButtonControl')
+    assert 2.0<=result.elapsed<3.0
+
+def test_waits_for_an_element_to_disappear(desktop,clock,window,monkeypatch):
+    monkeypatch.setattr(src.desktop,'Control',fake_control(clock,window,[]))
+    waiter=Waiter(initial_interval=0.1,max_interval=1.0,backoff=1.5,clock=clock,sleep=clock.sleep)
+    result=desktop.wait_for('disappears',name='Next',timeout=3,waiter=waiter)
+    assert not result.satisfied
+    assert result.elapsed==pytest.approx(3.0)
+    window.children.clear()
+    result=desktop.wait_for('disappears',name='Next',timeout=3,waiter=Waiter(clock=clock,sleep=clock.sleep))
+    assert result.satisfied
+    assert result.probes==1
+
+@pytest.mark.parametrize('condition',['appears','disappears'])
+def test_element_conditions_need_a_name_or_control_type(desktop,condition):
+    with pytest.raises(ValueError,match='No name or control_type'):
+        desktop.wait_for(condition)